@@ -0,0 +1,85 @@
+import logging
+import threading
+import time
+
+from selenium import webdriver
+
+# Com os comandos serializados, cada sessão tem no máximo um comando em andamento: uma conexão
+# keep-alive com o chromedriver basta e é sempre reaproveitada
+CONEXOES_DRIVER = 1
+
+
+class LatenciaComandos:
+    """Contadores por comando WebDriver (chamadas, erros, tempo total e máximo) de todas as sessões.
+
+    Também soma o tempo que os comandos esperaram pela vez da sessão, que indica disputa
+    entre threads pelo mesmo navegador.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._comandos = {}
+        self.espera_s = 0.0
+
+    def registrar(self, comando, duracao, espera, erro=False):
+        with self._lock:
+            contador = self._comandos.setdefault(comando, {"chamadas": 0, "erros": 0, "total_s": 0.0, "max_s": 0.0})
+            contador["chamadas"] += 1
+            contador["erros"] += erro
+            contador["total_s"] += duracao
+            contador["max_s"] = max(contador["max_s"], duracao)
+            self.espera_s += espera
+
+    def contadores(self):
+        with self._lock:
+            return {comando: dict(contador) for comando, contador in self._comandos.items()}
+
+    def resumo(self, mais_lentos=8):
+        """Linhas com os comandos que mais somaram tempo, para o log do fim da execução."""
+        contadores = sorted(self.contadores().items(), key=lambda item: item[1]["total_s"], reverse=True)
+        chamadas = sum(contador["chamadas"] for _, contador in contadores)
+        linhas = [f"Comandos WebDriver: {chamadas} chamadas; espera pela sessão {self.espera_s:.1f}s"]
+        for comando, contador in contadores[:mais_lentos]:
+            linhas.append(f"  {comando}: {contador['chamadas']} chamadas, total {contador['total_s']:.1f}s, "
+                          f"média {contador['total_s'] / contador['chamadas'] * 1000:.0f} ms, "
+                          f"máx {contador['max_s'] * 1000:.0f} ms, {contador['erros']} erros")
+        return linhas
+
+
+latencias = LatenciaComandos()
+
+
+class ChromeSerializado(webdriver.Chrome):
+    """webdriver.Chrome com os comandos da sessão serializados entre as threads.
+
+    Todo comando (inclusive os de elementos, que também passam por WebDriver.execute) espera
+    a vez da sessão em `lock`, um RLock que também pode envolver uma sequência de comandos que
+    não pode ser intercalada com os de outra thread (ex.: o login). O pool de conexões com o
+    chromedriver é redimensionado para CONEXOES_DRIVER, e a latência de cada comando vai para
+    `latencias`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.lock = threading.RLock()
+        super().__init__(*args, **kwargs)
+        executor = self.command_executor
+        try:
+            executor._client_config.init_args_for_pool_manager = {
+                "init_args_for_pool_manager": {"maxsize": CONEXOES_DRIVER}
+            }
+            anterior, executor._conn = executor._conn, executor._get_connection_manager()
+            anterior.clear()
+        except AttributeError as e:
+            logging.warning(f"Pool de conexões do WebDriver mantido no tamanho padrão: {e}")
+
+    def execute(self, driver_command, params=None):
+        chegada = time.perf_counter()
+        with self.lock:
+            inicio = time.perf_counter()
+            try:
+                resposta = super().execute(driver_command, params)
+            except Exception:
+                latencias.registrar(driver_command, time.perf_counter() - inicio, inicio - chegada, erro=True)
+                raise
+            latencias.registrar(driver_command, time.perf_counter() - inicio, inicio - chegada)
+            return resposta
@@ -0,0 +1,225 @@
+"""Resumo das falhas registradas nos logs da extração.
+
+Lê os logs em JSON Lines (logs/extracao_itens_sei.jsonl e os rotacionados .N.gz) e, se
+existir, o log em texto das versões anteriores (extracao_itens_sei.log), linha a linha, e
+mostra os processos que falharam, as assinaturas de erro mais frequentes e a lista de
+processos para repetir, que pode ser gravada como planilha com a aba PROCESSO.
+Ex.: python analisar_logs.py --desde 2025-06-01 --retentativa excel/repetir.xlsx
+"""
+import argparse
+import glob
+import gzip
+import io
+import json
+import os
+import re
+import time
+from collections import Counter
+
+atual_dir = os.path.dirname(os.path.abspath(__file__))
+log_path = os.path.join(atual_dir, 'logs', 'extracao_itens_sei.jsonl')
+log_texto_path = os.path.join(atual_dir, 'extracao_itens_sei.log')
+
+FALHA = "falha"
+
+# Só as linhas de erro e de status final interessam; as demais são descartadas sem interpretar o JSON
+RE_LINHA_JSON_RELEVANTE = re.compile(rb'"nivel": "(?:ERROR|CRITICAL)"|"status": ')
+# Log em texto antigo: "2025-06-10 14:12:39,798 - ERROR - mensagem"
+RE_LINHA_TEXTO = re.compile(rb"^(\d{4}-\d\d-\d\d) (\d\d:\d\d:\d\d),\d+ - (ERROR|CRITICAL) - (.*)")
+RE_PROCESSO = re.compile(r"\b\d{5}\.\d{6}/\d{2,4}-\d{2}\b")
+
+# Partes variáveis das mensagens, trocadas por marcadores para agrupar erros iguais
+NORMALIZACOES = [
+    (RE_PROCESSO, "<processo>"),
+    (re.compile(r"https?://\S+"), "<url>"),
+    (re.compile(r"\b[0-9a-f]{16,}\b", re.IGNORECASE), "<id>"),
+    (re.compile(r"\d+(?:[.,]\d+)?"), "#"),
+    (re.compile(r"\s+"), " "),
+]
+TAMANHO_ASSINATURA = 160
+
+
+def assinatura(mensagem):
+    """Mensagem sem números de processo, URLs, identificadores e números; o stacktrace do Selenium é descartado."""
+    mensagem = mensagem.split("Stacktrace:", 1)[0]
+    for padrao, marcador in NORMALIZACOES:
+        mensagem = padrao.sub(marcador, mensagem)
+    return mensagem.strip()[:TAMANHO_ASSINATURA] or "(sem mensagem)"
+
+
+def decodificar(linha):
+    # O log antigo mistura UTF-8 e Windows-1252
+    try:
+        return linha.decode("utf-8")
+    except UnicodeDecodeError:
+        return linha.decode("cp1252", errors="replace")
+
+
+def arquivos_padrao():
+    """Log em texto antigo primeiro e depois os JSON Lines, do rotacionado mais antigo ao atual."""
+    rotacionados = glob.glob(f"{glob.escape(log_path)}.*.gz")
+    rotacionados.sort(key=lambda caminho: int(caminho[len(log_path) + 1:-len(".gz")] or 0), reverse=True)
+    candidatos = [log_texto_path, *rotacionados, log_path]
+    return [caminho for caminho in candidatos if os.path.exists(caminho)]
+
+
+def ler_registros(caminho, desde=None):
+    """Registros de erro e de status final do arquivo, como dicionários no formato do log JSON."""
+    # O BufferedReader lê as linhas do gzip em C, bem mais rápido que GzipFile.readline
+    abrir = (lambda nome, modo: io.BufferedReader(gzip.open(nome, modo), 1024 * 1024)) if caminho.endswith(".gz") else open
+    decodificador = json.JSONDecoder()
+    relevante = RE_LINHA_JSON_RELEVANTE.search
+    with abrir(caminho, "rb") as arquivo:
+        if ".jsonl" in os.path.basename(caminho):
+            for linha in arquivo:
+                if relevante(linha) is None:
+                    continue
+                try:
+                    registro = decodificador.decode(linha.decode("utf-8"))
+                except ValueError:
+                    continue
+                if desde is None or registro.get("ts", "") >= desde:
+                    yield registro
+        else:
+            for linha in arquivo:
+                partes = RE_LINHA_TEXTO.match(linha)
+                if partes is None:
+                    continue
+                data, hora, nivel, mensagem = (decodificar(parte) for parte in partes.groups())
+                if desde is not None and data < desde:
+                    continue
+                processo = RE_PROCESSO.search(mensagem)
+                registro = {"ts": f"{data}T{hora}", "nivel": nivel, "msg": mensagem}
+                if processo:
+                    registro["processo"] = processo.group(0)
+                yield registro
+
+
+class ResumoFalhas:
+    """Acumula, por processo, os erros e o último status final registrado."""
+
+    def __init__(self):
+        self.processos = {}
+        self.assinaturas = Counter()
+        self.processos_por_assinatura = {}
+        self.registros = 0
+
+    def adicionar(self, registro):
+        self.registros += 1
+        processo = registro.get("processo")
+        if "status" in registro:
+            if processo is not None:
+                resumo = self._resumo(processo)
+                resumo["status"] = registro["status"]
+                resumo["ts"] = registro.get("ts", "")
+                if registro["status"] == FALHA and registro.get("erro"):
+                    resumo["ultimo_erro"] = registro["erro"]
+            return
+        chave = (registro.get("etapa", "-"), assinatura(registro.get("msg", "")))
+        self.assinaturas[chave] += 1
+        if processo is None:
+            return
+        self.processos_por_assinatura.setdefault(chave, set()).add(processo)
+        resumo = self._resumo(processo)
+        resumo["erros"] += 1
+        resumo["ts"] = registro.get("ts", "")
+        resumo["etapa"] = registro.get("etapa", resumo["etapa"])
+        resumo["documento"] = registro.get("documento", resumo["documento"])
+        resumo["ultimo_erro"] = registro.get("msg", "")
+
+    def _resumo(self, processo):
+        return self.processos.setdefault(processo, {
+            "erros": 0, "status": None, "ts": "", "etapa": "-", "documento": "-", "ultimo_erro": "",
+        })
+
+    def falhas(self):
+        """Processos cujo último status é falha, ou que tiveram erros sem status final registrado depois."""
+        return {
+            processo: resumo for processo, resumo in self.processos.items()
+            if resumo["status"] == FALHA or (resumo["status"] is None and resumo["erros"])
+        }
+
+
+def encurtar(texto, tamanho):
+    texto = " ".join(str(texto).split())
+    return texto if len(texto) <= tamanho else texto[:tamanho - 1] + "…"
+
+
+def imprimir_falhas(falhas):
+    print(f"\nProcessos com falha: {len(falhas)}")
+    if not falhas:
+        return
+    print(f"{'PROCESSO':<22} {'STATUS':<10} {'ERROS':>5}  {'ÚLTIMO REGISTRO':<19}  {'ETAPA':<20} {'DOCUMENTO':<30} ÚLTIMO ERRO")
+    for processo, resumo in sorted(falhas.items(), key=lambda item: item[1]["ts"], reverse=True):
+        print(f"{processo:<22} {resumo['status'] or '?':<10} {resumo['erros']:>5}  {resumo['ts'][:19]:<19}  "
+              f"{encurtar(resumo['etapa'], 20):<20} {encurtar(resumo['documento'], 30):<30} "
+              f"{encurtar(resumo['ultimo_erro'].split('Stacktrace:', 1)[0], 100)}")
+
+
+def imprimir_assinaturas(resumo, quantidade):
+    print(f"\nErros mais frequentes ({sum(resumo.assinaturas.values())} registros de erro):")
+    print(f"{'OCORR.':>7} {'PROCESSOS':>9}  {'ETAPA':<20} ASSINATURA")
+    for (etapa, texto), ocorrencias in resumo.assinaturas.most_common(quantidade):
+        processos = len(resumo.processos_por_assinatura.get((etapa, texto), ()))
+        print(f"{ocorrencias:>7} {processos:>9}  {encurtar(etapa, 20):<20} {texto}")
+
+
+def gravar_retentativa(caminho, processos):
+    """Grava os processos na aba PROCESSO de uma planilha (.xlsx) ou, em texto, um por linha com o cabeçalho."""
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    os.makedirs(pasta, exist_ok=True)
+    if caminho.lower().endswith(".xlsx"):
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        aba = workbook.create_sheet("PROCESSO")
+        aba.append(["PROCESSO"])
+        for processo in processos:
+            aba.append([processo])
+        workbook.save(caminho)
+    else:
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            arquivo.write("PROCESSO\n")
+            arquivo.writelines(f"{processo}\n" for processo in processos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resume as falhas registradas nos logs da extração de itens do SEI")
+    parser.add_argument("arquivos", nargs="*",
+                        help="Logs a ler, do mais antigo ao mais recente (padrão: o log em texto antigo e logs/extracao_itens_sei.jsonl*)")
+    parser.add_argument("--desde", help="Considera só os registros a partir desta data (AAAA-MM-DD)")
+    parser.add_argument("--top", type=int, default=15, help="Quantidade de assinaturas de erro exibidas (padrão: 15)")
+    parser.add_argument("--retentativa",
+                        help="Grava os processos com falha para uma nova execução: .xlsx com a aba PROCESSO ou texto com um processo por linha")
+    args = parser.parse_args()
+    if args.desde is not None and not re.fullmatch(r"\d{4}-\d\d-\d\d", args.desde):
+        parser.error("--desde deve estar no formato AAAA-MM-DD")
+
+    arquivos = args.arquivos or arquivos_padrao()
+    if not arquivos:
+        parser.error(f"Nenhum log encontrado em {os.path.dirname(log_path)}")
+
+    inicio = time.perf_counter()
+    resumo = ResumoFalhas()
+    for caminho in arquivos:
+        for registro in ler_registros(caminho, args.desde):
+            resumo.adicionar(registro)
+    falhas = resumo.falhas()
+    print(f"{len(arquivos)} arquivos, {resumo.registros} registros de erro/status lidos em {time.perf_counter() - inicio:.1f}s")
+
+    imprimir_falhas(falhas)
+    imprimir_assinaturas(resumo, args.top)
+
+    # Do erro mais recente ao mais antigo, como na tabela
+    processos = [processo for processo, _ in sorted(falhas.items(), key=lambda item: item[1]["ts"], reverse=True)]
+    if args.retentativa:
+        gravar_retentativa(args.retentativa, processos)
+        print(f"\n{len(processos)} processos gravados em {args.retentativa}")
+    elif processos:
+        print("\nProcessos para repetir (aba PROCESSO):")
+        print("PROCESSO")
+        print("\n".join(processos))
+
+
+if __name__ == "__main__":
+    main()
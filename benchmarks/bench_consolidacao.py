@@ -0,0 +1,75 @@
+"""Benchmark da consolidação dos itens extraídos (consolidacao_itens) sobre fixtures/itens.
+
+Antes de medir, confere o resultado de consolidar() para itens_extraidos.csv com esperado.csv
+(tamanho, gênero e quantidade normalizados e repetições removidas, sem perder itens de gênero
+ou tamanho diferentes) e encerra com código 1 se divergir. Em seguida consolida os itens
+replicados até o número de linhas pedido e informa linhas/segundo.
+
+Uso:
+    python benchmarks/bench_consolidacao.py [--linhas 300000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, raiz)
+
+from consolidacao_itens import agregar, consolidar
+
+fixtures_dir = os.path.join(raiz, 'fixtures', 'itens')
+COLUNAS_CONFERIDAS = ["PROCESSO", "NOME ARQUIVO", "MATERIAL", "MODELO", "TAMANHO", "GENERO", "QUANTIDADE"]
+
+
+def carregar_fixtures():
+    itens = pd.read_csv(os.path.join(fixtures_dir, 'itens_extraidos.csv'), dtype=str, keep_default_na=False)
+    esperado = pd.read_csv(os.path.join(fixtures_dir, 'esperado.csv'), dtype=str, keep_default_na=False)
+    return itens, esperado
+
+
+def conferir(itens, esperado):
+    obtido = consolidar(itens)[COLUNAS_CONFERIDAS].astype("string").fillna("")
+    esperado = esperado[COLUNAS_CONFERIDAS].astype("string")
+    divergencias = 0
+    for indice in range(max(len(obtido), len(esperado))):
+        linha_obtida = obtido.iloc[indice].tolist() if indice < len(obtido) else None
+        linha_esperada = esperado.iloc[indice].tolist() if indice < len(esperado) else None
+        if linha_obtida != linha_esperada:
+            divergencias += 1
+            print(f"DIVERGENTE linha {indice + 1}: {linha_obtida} (esperado {linha_esperada})")
+    return divergencias
+
+
+def medir(itens, linhas):
+    replicados = pd.concat([itens] * (linhas // len(itens) + 1), ignore_index=True).head(linhas)
+    # Processos distintos a cada réplica, para que a remoção de repetições não descarte quase tudo
+    replicados["PROCESSO"] = replicados["PROCESSO"] + "-" + (replicados.index // len(itens)).astype(str)
+    inicio = time.perf_counter()
+    consolidado = consolidar(replicados)
+    meio = time.perf_counter()
+    agregar(consolidado)
+    fim = time.perf_counter()
+    return len(replicados), len(consolidado), meio - inicio, fim - meio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, default=300000)
+    args = parser.parse_args()
+
+    itens, esperado = carregar_fixtures()
+    divergencias = conferir(itens, esperado)
+    print(f"consolidação dos fixtures {'diverge de' if divergencias else 'confere com'} esperado.csv")
+    if divergencias:
+        sys.exit(1)
+
+    linhas, consolidadas, duracao, duracao_agregados = medir(itens, args.linhas)
+    print(f"{linhas} linhas ({consolidadas} após remover repetições) em {duracao:.2f}s: "
+          f"{linhas / duracao:.0f} linhas/s | agregados em {duracao_agregados:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Benchmark ponta a ponta do extrator contra o SEI simulado (benchmarks/mock_sei.py).
+
+Sobe o servidor simulado, abre o Chrome em modo headless com SeiLogin, faz o login e executa
+o extrator real (encontrar_arquivos / encontrar_arquivos_paralelo de extracao_itens-sei.py)
+gravando planilha, journal e estado em um diretório temporário. Ao final informa
+processos/minuto, comandos WebDriver (round trips) e requisições HTTP por documento e o pico
+de memória do Python e do navegador.
+
+Uso:
+    python benchmarks/bench_extracao.py --processos 20 --latencia-ms 150 --workers 2
+    python benchmarks/bench_extracao.py --processos 20 --latencia-ms 150 --http --conexoes-http 4
+
+Requer Google Chrome instalado; sem --chromedriver, o Selenium Manager localiza o driver.
+O pico de memória do navegador só é medido se o psutil estiver instalado; o do Python vem do
+módulo resource (POSIX) ou, no Windows, do psutil.
+"""
+import argparse
+import importlib.util
+import itertools
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, raiz)
+
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from login_sei import SeiLogin, PERFIS, PERFIL_PADRAO
+from journal_itens import JournalItens
+from estado_extracao import EstadoExtracao
+from extratores import PendenciasAssincronas
+from cliente_http import ClienteSei
+from acesso_driver import latencias
+from metricas import MedidorEtapas
+from mock_sei import ServidorSeiSimulado, gerar_processos
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    # Só existe em sistemas POSIX; no Windows o pico vem do psutil
+    import resource
+except ImportError:
+    resource = None
+
+
+def carregar_extrator():
+    caminho = os.path.join(raiz, 'extracao_itens-sei.py')
+    spec = importlib.util.spec_from_file_location('extracao_itens_sei', caminho)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def contar_comandos_webdriver():
+    """Conta os comandos enviados ao chromedriver por todas as sessões (cada um é um round trip HTTP)."""
+    contador = itertools.count()
+    execute_original = WebDriver.execute
+
+    def execute(self, driver_command, params=None):
+        next(contador)
+        return execute_original(self, driver_command, params)
+
+    WebDriver.execute = execute
+    return lambda: next(contador)
+
+
+def pico_memoria_python():
+    """Pico de memória deste processo em MB, ou None se não houver como medir."""
+    if resource is not None:
+        # ru_maxrss em KB no Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    if psutil is not None:
+        # peak_wset: pico do working set, só no Windows
+        pico = getattr(psutil.Process().memory_info(), "peak_wset", None)
+        if pico is not None:
+            return pico / 1024 / 1024
+    return None
+
+
+class MonitorMemoria:
+    """Amostra o RSS do navegador (filhos deste processo) em segundo plano e guarda o pico."""
+
+    def __init__(self, intervalo=0.5):
+        self.intervalo = intervalo
+        self.pico_navegador = 0
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, daemon=True)
+
+    def _amostrar(self):
+        processo = psutil.Process()
+        while not self._parar.wait(self.intervalo):
+            total = 0
+            for filho in processo.children(recursive=True):
+                try:
+                    total += filho.memory_info().rss
+                except psutil.Error:
+                    pass
+            self.pico_navegador = max(self.pico_navegador, total)
+
+    def __enter__(self):
+        if psutil is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processos", type=int, default=20)
+    parser.add_argument("--documentos", type=int, default=6, help="Documentos por processo (metade são Termos)")
+    parser.add_argument("--latencia-ms", type=float, default=150)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--taxa-falha", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--abas", type=int, default=1, help="Abas de pré-carregamento por navegador (padrão: 1)")
+    parser.add_argument("--http", action="store_true", help="Baixa árvore e documentos por HTTP com os cookies do navegador")
+    parser.add_argument("--conexoes-http", type=int, default=4, help="Conexões simultâneas com --http (padrão: 4)")
+    parser.add_argument("--perfil", choices=PERFIS, default=PERFIL_PADRAO, help="Perfil do navegador (ambos rodam headless aqui)")
+    parser.add_argument("--chromedriver", help="Caminho do chromedriver (padrão: Selenium Manager)")
+    args = parser.parse_args()
+
+    processos = gerar_processos(args.processos, args.documentos)
+    servidor = ServidorSeiSimulado(processos, latencia_ms=args.latencia_ms, jitter_ms=args.jitter_ms,
+                                   taxa_falha=args.taxa_falha)
+    url = servidor.iniciar()
+
+    # Configura o logging antes do extrator, cujo configurar_logs gravaria no log da aplicação
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    extrator = carregar_extrator()
+    saida = tempfile.mkdtemp(prefix="bench_extracao_")
+    opcoes = Options()
+    opcoes.add_argument("--headless=new")
+    extrator.excel_path = os.path.join(saida, 'itens_extraidos.xlsx')
+    extrator.journal = JournalItens(os.path.join(saida, 'itens_extraidos.journal.csv'), extrator.colunas)
+    extrator.estado = EstadoExtracao(os.path.join(saida, 'estado_extracao.sqlite'))
+    extrator.pendencias = PendenciasAssincronas(extrator.estado)
+    extrator.cache = None
+    extrator.medidor = MedidorEtapas(os.path.join(saida, 'tempos.jsonl'))
+    extrator.sei_url = url
+    extrator.abas_prefetch = args.abas
+    if args.http:
+        extrator.cliente_http = ClienteSei(url, args.conexoes_http)
+    extrator.chromedriver_path = args.chromedriver
+    extrator.chrome_options = opcoes
+
+    comandos = contar_comandos_webdriver()
+    with MonitorMemoria() as monitor:
+        sei = SeiLogin(args.chromedriver, opcoes, url=url, interface=False,
+                       perfil=args.perfil, diretorio_perfil=os.path.join(saida, 'perfil_chrome'))
+        inicio_login = time.perf_counter()
+        if not sei.login("benchmark", "benchmark", notificar=False):
+            sys.exit("Falha no login no SEI simulado")
+        duracao_login = time.perf_counter() - inicio_login
+
+        lista = list(processos)
+        comandos_antes = comandos()
+        inicio = time.perf_counter()
+        if args.http:
+            extrator.encontrar_arquivos_http(sei, lista)
+        elif args.workers > 1:
+            extrator.encontrar_arquivos_paralelo(sei, lista, args.workers)
+        else:
+            extrator.encontrar_arquivos(sei, lista)
+        duracao = time.perf_counter() - inicio
+        comandos_extracao = comandos() - comandos_antes
+        sei.encerrar()
+    servidor.parar()
+
+    documentos = servidor.requisicoes["documento_visualizar"]
+    requisicoes_http = sum(servidor.requisicoes.values())
+    resumo = extrator.estado.resumo()
+    pico_python = pico_memoria_python()
+
+    print(f"login: {duracao_login:.1f}s")
+    print(f"{len(lista)} processos, {documentos} documentos em {duracao:.1f}s "
+          f"({len(lista) / duracao * 60:.1f} processos/min, workers={args.workers}, abas={args.abas}, perfil={args.perfil}"
+          + (f", http com {args.conexoes_http} conexões" if args.http else "") + ")")
+    print(f"estado final: {resumo}")
+    print(f"retentativas: {extrator.politica.resumo()}")
+    print(f"navegador: {extrator.supervisor.resumo()}")
+    if args.abas > 1:
+        print(f"pré-carregamento: {extrator.totais_prefetch.resumo()}")
+    if documentos:
+        print(f"round trips WebDriver por documento: {comandos_extracao / documentos:.1f} "
+              f"| requisições HTTP por documento: {requisicoes_http / documentos:.1f}")
+    print("pico de memória: Python " + (f"{pico_python:.0f} MB" if pico_python is not None else "-")
+          + (f" | navegador {monitor.pico_navegador / 1024 / 1024:.0f} MB" if psutil is not None else ""))
+    for linha in latencias.resumo():
+        print(linha)
+    for linha in extrator.medidor.resumo():
+        print(linha)
+    print(f"saída em {saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark do parser de Termos (parser_termo) sobre os fixtures em fixtures/termos.
+
+Antes de medir, confere o nome e a quantidade de itens de cada fixture com esperado.json e
+encerra com código 1 se algum divergir. Em seguida interpreta todos os documentos repetidas
+vezes e informa documentos/segundo e a latência por documento (p50, p95, máx).
+
+Uso:
+    python benchmarks/bench_parser_termo.py [--repeticoes 200] [--cache cache_documentos]
+
+Com --cache, os documentos reais guardados pelo cache de documentos também entram na medição.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, raiz)
+
+from parser_termo import extrair_conteudo, montar_itens
+
+fixtures_dir = os.path.join(raiz, 'fixtures', 'termos')
+
+
+def carregar_fixtures():
+    with open(os.path.join(fixtures_dir, 'esperado.json'), encoding='utf-8') as arquivo:
+        esperado = json.load(arquivo)
+    documentos = {}
+    for nome in esperado:
+        with open(os.path.join(fixtures_dir, nome), encoding='utf-8') as arquivo:
+            documentos[nome] = arquivo.read()
+    return documentos, esperado
+
+
+def carregar_cache(cache_dir):
+    from cache_documentos import CacheDocumentos
+    cache = CacheDocumentos(cache_dir)
+    documentos = {}
+    for processo, documento, _ in cache.listar():
+        html = cache.obter(processo, documento)
+        if html is not None:
+            documentos[f"{processo}/{documento}"] = html
+    return documentos
+
+
+def conferir(documentos, esperado):
+    divergencias = 0
+    for nome, html in documentos.items():
+        conteudo = extrair_conteudo(html)
+        itens = montar_itens("", nome, conteudo["nome"], conteudo["linhas"])
+        if conteudo["nome"] != esperado[nome]["nome"] or len(itens) != esperado[nome]["itens"]:
+            divergencias += 1
+            print(f"DIVERGENTE {nome}: nome={conteudo['nome']!r} itens={len(itens)} "
+                  f"(esperado nome={esperado[nome]['nome']!r} itens={esperado[nome]['itens']})")
+    return divergencias
+
+
+def medir(documentos, repeticoes):
+    latencias = []
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for nome, html in documentos.items():
+            t0 = time.perf_counter()
+            conteudo = extrair_conteudo(html)
+            montar_itens("", nome, conteudo["nome"], conteudo["linhas"])
+            latencias.append(time.perf_counter() - t0)
+    total = time.perf_counter() - inicio
+    return total, latencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=200)
+    parser.add_argument("--cache", help="Diretório do cache de documentos a incluir na medição")
+    args = parser.parse_args()
+
+    documentos, esperado = carregar_fixtures()
+    divergencias = conferir(documentos, esperado)
+    print(f"{len(documentos) - divergencias}/{len(documentos)} fixtures conferem com esperado.json")
+    if divergencias:
+        sys.exit(1)
+
+    if args.cache:
+        documentos.update(carregar_cache(args.cache))
+
+    total, latencias = medir(documentos, args.repeticoes)
+    latencias.sort()
+    p95 = latencias[int(len(latencias) * 0.95) - 1]
+    print(f"{len(latencias)} documentos em {total:.2f}s: {len(latencias) / total:.0f} documentos/s")
+    print(f"latência por documento: p50 {statistics.median(latencias) * 1000:.3f} ms | "
+          f"p95 {p95 * 1000:.3f} ms | máx {latencias[-1] * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""Servidor HTTP local que simula as partes do SEI usadas por SeiLogin e pelo extrator.
+
+Reproduz o formulário de login (txtUsuario/pwdSenha/sbmAcessar), a tela inicial com
+divInfraAreaTela e txtPesquisaRapida, a tela do processo com os iframes ifrArvore e
+ifrVisualizacao, a árvore frmArvore e a visualização ifrArvoreHtml com o HTML dos Termos
+de fixtures/termos. Latência e falhas são configuráveis para medir o extrator sem acesso
+ao SEI real.
+
+Uso:
+    python benchmarks/mock_sei.py --porta 8765 --processos 20 --latencia-ms 150 --taxa-falha 0.05
+"""
+import argparse
+import html
+import os
+import random
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, raiz)
+
+from entrada_processos import gerar_nup
+
+fixtures_dir = os.path.join(raiz, 'fixtures', 'termos')
+
+PAGINA_LOGIN = """<!DOCTYPE html>
+<html><head><title>SIP - Login</title></head><body>
+<form id="frmLogin" method="post" action="/sip/login.php?sigla_orgao_sistema=ANTT&amp;sigla_sistema=SEI">
+<input type="text" id="txtUsuario" name="txtUsuario" />
+<input type="password" id="pwdSenha" name="pwdSenha" />
+<button type="submit" id="sbmAcessar" name="sbmAcessar" value="Acessar">Acessar</button>
+</form>{mensagem}
+</body></html>"""
+
+BARRA_SUPERIOR = """<div id="divInfraBarraSistema">
+<form id="frmProtocoloPesquisaRapida" method="get" action="/sei/controlador.php">
+<input type="hidden" name="acao" value="protocolo_pesquisa_rapida" />
+<input type="text" id="txtPesquisaRapida" name="txtPesquisaRapida" />
+</form></div>"""
+
+PAGINA_INICIAL = """<!DOCTYPE html>
+<html><head><title>SEI - Controle de Processos</title></head><body>
+{barra}
+<div id="divInfraAreaTela"><p>{mensagem}</p></div>
+</body></html>"""
+
+PAGINA_PROCESSO = """<!DOCTYPE html>
+<html><head><title>SEI - {processo}</title></head><body>
+{barra}
+<div id="divInfraAreaTela">
+<iframe id="ifrArvore" name="ifrArvore" src="/sei/controlador.php?acao=procedimento_visualizar&amp;id_procedimento={id_procedimento}"></iframe>
+<iframe id="ifrVisualizacao" name="ifrVisualizacao" src="about:blank"></iframe>
+</div></body></html>"""
+
+PAGINA_ARVORE = """<!DOCTYPE html>
+<html><head><title>Árvore</title></head><body>
+<form id="frmArvore" method="post">
+{nos}
+</form></body></html>"""
+
+PAGINA_VISUALIZACAO = """<!DOCTYPE html>
+<html><head><title>Visualização</title></head><body>
+<div id="divArvoreAcoes"></div>
+<iframe id="ifrArvoreHtml" name="ifrArvoreHtml" src="/sei/controlador.php?acao=documento_visualizar&amp;id_documento={id_documento}"></iframe>
+</body></html>"""
+
+
+def carregar_termos():
+    return [
+        open(os.path.join(fixtures_dir, nome), encoding='utf-8').read()
+        for nome in sorted(os.listdir(fixtures_dir))
+        if nome.endswith('.html')
+    ]
+
+
+def gerar_processos(quantidade, documentos_por_processo, semente=0):
+    """Gera a massa de processos: número -> lista de (id_documento, titulo, html ou None)."""
+    termos = carregar_termos()
+    aleatorio = random.Random(semente)
+    outros = ["Despacho", "Ofício", "Requerimento", "Nota Técnica"]
+    processos = {}
+    id_documento = 30000000
+    for i in range(quantidade):
+        # Números com dígitos verificadores válidos, como os que passam pela validação da entrada
+        numero = gerar_nup(f"50500{100000 + i:06d}2024")
+        documentos = []
+        for j in range(documentos_por_processo):
+            id_documento += 1
+            if j % 2 == 0:
+                documentos.append((str(id_documento), f"Termo de Recebimento {id_documento}", aleatorio.choice(termos)))
+            else:
+                documentos.append((str(id_documento), f"{aleatorio.choice(outros)} {id_documento}", None))
+        processos[numero] = documentos
+    return processos
+
+
+class ServidorSeiSimulado:
+    """Servidor SEI simulado, executado em uma thread própria.
+
+    latencia_ms/jitter_ms atrasam cada resposta; taxa_falha é a fração de respostas das
+    páginas de árvore e de documento que devolvem HTTP 500. requisicoes conta as
+    requisições recebidas por ação.
+    """
+
+    def __init__(self, processos, porta=0, latencia_ms=0, jitter_ms=0, taxa_falha=0.0,
+                 usuario=None, senha=None, semente=0):
+        self.processos = processos
+        self.latencia_ms = latencia_ms
+        self.jitter_ms = jitter_ms
+        self.taxa_falha = taxa_falha
+        self.usuario = usuario
+        self.senha = senha
+        self.requisicoes = Counter()
+        self.sessoes = set()
+        self._aleatorio = random.Random(semente)
+        self._lock = threading.Lock()
+        self._documentos = {
+            id_documento: (numero, titulo, conteudo)
+            for numero, documentos in processos.items()
+            for id_documento, titulo, conteudo in documentos
+        }
+        self._ids_procedimento = {numero: str(10000000 + i) for i, numero in enumerate(processos)}
+        self._numeros = {id_procedimento: numero for numero, id_procedimento in self._ids_procedimento.items()}
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", porta), self._criar_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/"
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-sei", daemon=True)
+        self._thread.start()
+        return self.url
+
+    def parar(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _atrasar(self):
+        atraso = self.latencia_ms
+        if self.jitter_ms:
+            with self._lock:
+                atraso += self._aleatorio.uniform(-self.jitter_ms, self.jitter_ms)
+        if atraso > 0:
+            time.sleep(atraso / 1000)
+
+    def _falhar(self):
+        if not self.taxa_falha:
+            return False
+        with self._lock:
+            return self._aleatorio.random() < self.taxa_falha
+
+    def _criar_handler(self):
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Conexões keep-alive, como as do SEI (todas as respostas têm Content-Length)
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, formato, *args):
+                pass
+
+            def _responder(self, status, corpo="", cabecalhos=None):
+                dados = corpo.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(dados)))
+                for nome, valor in (cabecalhos or {}).items():
+                    self.send_header(nome, valor)
+                self.end_headers()
+                self.wfile.write(dados)
+
+            def _redirecionar(self, destino, cabecalhos=None):
+                self._responder(302, "", dict(cabecalhos or {}, Location=destino))
+
+            def _sessao_valida(self):
+                for parte in self.headers.get("Cookie", "").split(";"):
+                    nome, _, valor = parte.strip().partition("=")
+                    if nome == "SEI_SESSAO" and valor in servidor.sessoes:
+                        return True
+                return False
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                servidor._atrasar()
+                if url.path != "/sip/login.php":
+                    self._responder(404, "Não encontrado")
+                    return
+                servidor.requisicoes["login_post"] += 1
+                tamanho = int(self.headers.get("Content-Length", 0))
+                campos = parse_qs(self.rfile.read(tamanho).decode("utf-8"))
+                usuario = campos.get("txtUsuario", [""])[0]
+                senha = campos.get("pwdSenha", [""])[0]
+                aceito = usuario and senha and servidor.usuario in (None, usuario) and servidor.senha in (None, senha)
+                if not aceito:
+                    self._responder(200, PAGINA_LOGIN.format(mensagem="<p>Usuário ou senha inválidos.</p>"))
+                    return
+                sessao = secrets.token_hex(16)
+                servidor.sessoes.add(sessao)
+                self._redirecionar(
+                    "/sei/controlador.php?acao=procedimento_controlar",
+                    {"Set-Cookie": f"SEI_SESSAO={sessao}; Path=/; HttpOnly"},
+                )
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                parametros = {chave: valores[0] for chave, valores in parse_qs(url.query).items()}
+                servidor._atrasar()
+
+                if url.path == "/sip/login.php":
+                    servidor.requisicoes["login"] += 1
+                    self._responder(200, PAGINA_LOGIN.format(mensagem=""))
+                    return
+                if url.path == "/":
+                    destino = ("/sei/controlador.php?acao=procedimento_controlar" if self._sessao_valida()
+                               else "/sip/login.php?sigla_orgao_sistema=ANTT&sigla_sistema=SEI")
+                    self._redirecionar(destino)
+                    return
+                if url.path != "/sei/controlador.php":
+                    self._responder(404, "Não encontrado")
+                    return
+                if not self._sessao_valida():
+                    servidor.requisicoes["sessao_expirada"] += 1
+                    self._redirecionar("/sip/login.php?sigla_orgao_sistema=ANTT&sigla_sistema=SEI")
+                    return
+
+                acao = parametros.get("acao", "")
+                servidor.requisicoes[acao] += 1
+
+                if acao == "procedimento_controlar":
+                    self._responder(200, PAGINA_INICIAL.format(barra=BARRA_SUPERIOR, mensagem="Controle de Processos"))
+                elif acao == "protocolo_pesquisa_rapida":
+                    numero = parametros.get("txtPesquisaRapida", "").strip()
+                    if numero not in servidor.processos:
+                        # Como no SEI, o protocolo inexistente é informado em um alert
+                        self._responder(200, PAGINA_INICIAL.format(
+                            barra=BARRA_SUPERIOR,
+                            mensagem=f"<script>alert('Protocolo {html.escape(numero)} não encontrado.');</script>"))
+                        return
+                    self._responder(200, PAGINA_PROCESSO.format(
+                        barra=BARRA_SUPERIOR, processo=html.escape(numero),
+                        id_procedimento=servidor._ids_procedimento[numero]))
+                elif acao == "procedimento_visualizar":
+                    if servidor._falhar():
+                        self._responder(500, "Erro interno simulado")
+                        return
+                    id_procedimento = parametros.get("id_procedimento", "")
+                    numero = servidor._numeros.get(id_procedimento)
+                    if numero is None:
+                        self._responder(404, "Processo não encontrado")
+                        return
+                    nos = [f'<a id="anchorRaiz" href="/sei/controlador.php?acao=arvore_visualizar&amp;id_procedimento={id_procedimento}" '
+                           f'target="ifrVisualizacao"><span>{html.escape(numero)}</span></a>']
+                    for id_documento, titulo, _ in servidor.processos[numero]:
+                        nos.append(
+                            f'<a id="anchor{id_documento}" target="ifrVisualizacao" '
+                            f'href="/sei/controlador.php?acao=arvore_visualizar&amp;id_procedimento={id_procedimento}'
+                            f'&amp;id_documento={id_documento}"><span>{html.escape(titulo)}</span></a>'
+                        )
+                    self._responder(200, PAGINA_ARVORE.format(nos="\n".join(nos)))
+                elif acao == "arvore_visualizar":
+                    id_documento = parametros.get("id_documento", "")
+                    if id_documento not in servidor._documentos:
+                        self._responder(200, "<html><body><p>Processo</p></body></html>")
+                        return
+                    self._responder(200, PAGINA_VISUALIZACAO.format(id_documento=id_documento))
+                elif acao == "documento_visualizar":
+                    if servidor._falhar():
+                        self._responder(500, "Erro interno simulado")
+                        return
+                    documento = servidor._documentos.get(parametros.get("id_documento", ""))
+                    if documento is None:
+                        self._responder(404, "Documento não encontrado")
+                        return
+                    numero, titulo, conteudo = documento
+                    self._responder(200, conteudo or f"<html><body><p>{html.escape(titulo)}</p></body></html>")
+                else:
+                    self._responder(404, "Ação desconhecida")
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor SEI simulado para testes de desempenho")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--processos", type=int, default=20)
+    parser.add_argument("--documentos", type=int, default=6, help="Documentos por processo (metade são Termos)")
+    parser.add_argument("--latencia-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--taxa-falha", type=float, default=0.0)
+    args = parser.parse_args()
+
+    processos = gerar_processos(args.processos, args.documentos)
+    servidor = ServidorSeiSimulado(processos, porta=args.porta, latencia_ms=args.latencia_ms,
+                                   jitter_ms=args.jitter_ms, taxa_falha=args.taxa_falha)
+    print(f"SEI simulado em {servidor.iniciar()} com {len(processos)} processos:")
+    for numero in processos:
+        print(numero)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servidor.parar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import gzip
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+
+class CacheDocumentos:
+    """Cache em disco do HTML bruto dos Termos, endereçado por conteúdo.
+
+    Cada HTML é gravado compactado em objetos/<sha256[:2]>/<sha256>.html.gz; um índice SQLite
+    associa (processo, documento) ao hash do conteúdo. Documentos idênticos ocupam espaço uma
+    única vez. Quando o total em disco passa de limite_bytes, os objetos acessados há mais tempo
+    são removidos junto com suas entradas no índice.
+    """
+
+    def __init__(self, diretorio, limite_bytes=500 * 1024 * 1024):
+        self.diretorio = diretorio
+        self.limite_bytes = limite_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(diretorio, "objetos"), exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(diretorio, "indice.sqlite"), check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documentos (
+                processo TEXT NOT NULL,
+                documento TEXT NOT NULL,
+                titulo TEXT NOT NULL,
+                ordem INTEGER NOT NULL,
+                hash TEXT NOT NULL,
+                PRIMARY KEY (processo, documento)
+            );
+            CREATE TABLE IF NOT EXISTS objetos (
+                hash TEXT PRIMARY KEY,
+                tamanho INTEGER NOT NULL,
+                acessado_em REAL NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    def _caminho(self, hash_conteudo):
+        return os.path.join(self.diretorio, "objetos", hash_conteudo[:2], f"{hash_conteudo}.html.gz")
+
+    def salvar(self, processo, documento, titulo, ordem, html):
+        dados = html.encode("utf-8")
+        hash_conteudo = hashlib.sha256(dados).hexdigest()
+        caminho = self._caminho(hash_conteudo)
+        with self._lock:
+            if not os.path.exists(caminho):
+                os.makedirs(os.path.dirname(caminho), exist_ok=True)
+                temporario = f"{caminho}.{threading.get_ident()}.tmp"
+                with gzip.open(temporario, "wb") as arquivo:
+                    arquivo.write(dados)
+                os.replace(temporario, caminho)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO objetos (hash, tamanho, acessado_em) VALUES (?, ?, ?)",
+                (hash_conteudo, os.path.getsize(caminho), time.time()),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documentos (processo, documento, titulo, ordem, hash) VALUES (?, ?, ?, ?, ?)",
+                (processo, documento, titulo, ordem, hash_conteudo),
+            )
+            self._conn.commit()
+            self._aplicar_limite()
+
+    def obter(self, processo, documento):
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT hash FROM documentos WHERE processo = ? AND documento = ?", (processo, documento)
+            ).fetchone()
+            if linha is None:
+                return None
+            self._conn.execute("UPDATE objetos SET acessado_em = ? WHERE hash = ?", (time.time(), linha[0]))
+            self._conn.commit()
+        try:
+            with gzip.open(self._caminho(linha[0]), "rb") as arquivo:
+                return arquivo.read().decode("utf-8")
+        except OSError as e:
+            logging.error(f"Erro ao ler o documento {documento} do processo {processo} no cache: {e}")
+            return None
+
+    def listar(self):
+        """Retorna (processo, documento, titulo) de todos os documentos em cache, na ordem da árvore."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT processo, documento, titulo FROM documentos ORDER BY processo, ordem"
+            ).fetchall()
+
+    def _aplicar_limite(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(tamanho), 0) FROM objetos").fetchone()[0]
+        if total <= self.limite_bytes:
+            return
+        removidos = 0
+        for hash_conteudo, tamanho in self._conn.execute(
+            "SELECT hash, tamanho FROM objetos ORDER BY acessado_em"
+        ).fetchall():
+            if total <= self.limite_bytes:
+                break
+            try:
+                os.remove(self._caminho(hash_conteudo))
+            except FileNotFoundError:
+                pass
+            self._conn.execute("DELETE FROM objetos WHERE hash = ?", (hash_conteudo,))
+            self._conn.execute("DELETE FROM documentos WHERE hash = ?", (hash_conteudo,))
+            total -= tamanho
+            removidos += 1
+        self._conn.commit()
+        logging.info(f"Cache de documentos: {removidos} objetos removidos para respeitar o limite de {self.limite_bytes} bytes")
@@ -0,0 +1,183 @@
+import re
+import threading
+from urllib.parse import urlencode, urljoin, urlparse
+
+import urllib3
+from lxml import html as lxml_html
+
+# Conexões keep-alive com o SEI; também é o limite de requisições simultâneas
+CONEXOES_PADRAO = 4
+REDIRECIONAMENTOS_MAX = 5
+
+RE_CHARSET = re.compile(rb"charset=[\"']?([\w-]+)", re.IGNORECASE)
+RE_ALERTA = re.compile(r"alert\(\s*['\"](.*?)['\"]\s*\)", re.DOTALL)
+# O lxml recusa texto (str) com declaração de encoding, comum nas páginas XHTML do SEI
+RE_DECLARACAO_XML = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+
+class PaginaRequerJavascript(Exception):
+    """A página não traz no HTML o conteúdo que o navegador montaria com JavaScript."""
+
+
+class SessaoExpirada(Exception):
+    """O SEI redirecionou para o login: os cookies copiados do navegador não valem mais."""
+
+
+class AlertaSei(Exception):
+    """Alerta do SEI na página (ex.: protocolo não encontrado); permanente, como no navegador."""
+
+
+class ErroHttp(Exception):
+    """Resposta 4xx do SEI, que se repetiria igual em uma nova tentativa."""
+
+
+class ErroServidorHttp(urllib3.exceptions.HTTPError):
+    """Resposta 5xx do SEI; transitória, como as falhas de conexão do urllib3."""
+
+
+def decodificar(dados, content_type=""):
+    """Texto da resposta pelo charset do cabeçalho ou da tag meta (o SEI usa ISO-8859-1)."""
+    encontrado = RE_CHARSET.search(content_type.encode("latin-1", "replace")) or RE_CHARSET.search(dados[:2048])
+    try:
+        return dados.decode(encontrado.group(1).decode("ascii") if encontrado else "utf-8", errors="replace")
+    except LookupError:
+        return dados.decode("utf-8", errors="replace")
+
+
+def interpretar(pagina):
+    return lxml_html.fromstring(RE_DECLARACAO_XML.sub("", pagina, count=1))
+
+
+def url_iframe(pagina, url, id_iframe):
+    """URL absoluta do iframe id_iframe da página, ou None se ele não estiver no HTML."""
+    srcs = interpretar(pagina).xpath(f"//iframe[@id='{id_iframe}']/@src")
+    if not srcs or not srcs[0] or srcs[0] == "about:blank":
+        return None
+    return urljoin(url, srcs[0])
+
+
+def nos_arvore(pagina, url):
+    """Título e URL absoluta dos links do frmArvore, como lidos pelo navegador em JS_SNAPSHOT_ARVORE.
+
+    Lança PaginaRequerJavascript se a árvore não estiver no HTML (no SEI ela pode ser montada
+    por script).
+    """
+    links = interpretar(pagina).xpath("//form[@id='frmArvore']//a")
+    if not links:
+        raise PaginaRequerJavascript("árvore do processo montada por JavaScript")
+    return [
+        {"titulo": link.text_content().strip(), "href": urljoin(url, link.get("href"))}
+        for link in links
+        if link.get("href")
+    ]
+
+
+def alerta(pagina):
+    """Mensagem do alert() da página (ex.: "Protocolo ... não encontrado."), ou None."""
+    encontrado = RE_ALERTA.search(pagina)
+    return encontrado.group(1) if encontrado else None
+
+
+class ClienteSei:
+    """Cliente HTTP do SEI autenticado com os cookies da sessão do navegador.
+
+    As páginas são pedidas por um PoolManager do urllib3 com até `conexoes` conexões
+    keep-alive, compartilhado entre as threads; com block=True, a thread que passar do limite
+    espera uma conexão livre. Os redirecionamentos são seguidos aqui para guardar os cookies
+    que o SEI renovar no caminho; um redirecionamento para o login lança SessaoExpirada.
+    """
+
+    def __init__(self, url, conexoes=CONEXOES_PADRAO, timeout_s=30):
+        self.url = url
+        self.conexoes = conexoes
+        self._pool = urllib3.PoolManager(
+            maxsize=conexoes, block=True,
+            retries=urllib3.Retry(connect=2, read=0, redirect=False, status=0),
+            timeout=urllib3.Timeout(connect=10, read=timeout_s),
+        )
+        self._lock = threading.Lock()
+        self._cookies = {}
+        self._agente = None
+        self._pesquisa = None
+        self.requisicoes = 0
+
+    def copiar_cookies(self, driver):
+        """Passa a usar os cookies e o User-Agent da sessão autenticada do navegador."""
+        cookies = {cookie["name"]: cookie["value"] for cookie in driver.get_cookies()}
+        agente = driver.execute_script("return navigator.userAgent;")
+        with self._lock:
+            self._cookies = cookies
+            self._agente = agente
+            # O formulário de pesquisa pode trazer um hash ligado à sessão anterior
+            self._pesquisa = None
+
+    def _cabecalhos(self):
+        with self._lock:
+            cabecalhos = {"Cookie": "; ".join(f"{nome}={valor}" for nome, valor in self._cookies.items())}
+            if self._agente:
+                cabecalhos["User-Agent"] = self._agente
+            return cabecalhos
+
+    def _guardar_cookies(self, resposta):
+        for cabecalho in resposta.headers.getlist("Set-Cookie"):
+            nome, _, valor = cabecalho.split(";", 1)[0].strip().partition("=")
+            if nome:
+                with self._lock:
+                    self._cookies[nome] = valor
+
+    def obter(self, url, campos=None, metodo="GET"):
+        """Pede a página e retorna (URL final, HTML)."""
+        if campos and metodo == "GET":
+            # As URLs do SEI já têm query string (acao=...)
+            url += ("&" if "?" in url else "?") + urlencode(campos)
+            campos = None
+        for _ in range(REDIRECIONAMENTOS_MAX + 1):
+            opcoes = {"fields": campos, "encode_multipart": False} if metodo == "POST" else {}
+            resposta = self._pool.request(metodo, url, headers=self._cabecalhos(), redirect=False, **opcoes)
+            with self._lock:
+                self.requisicoes += 1
+            self._guardar_cookies(resposta)
+            if resposta.status in (301, 302, 303, 307, 308) and resposta.headers.get("Location"):
+                url = urljoin(url, resposta.headers["Location"])
+                if resposta.status in (301, 302, 303):
+                    metodo, campos = "GET", None
+                continue
+            break
+        else:
+            raise ErroHttp(f"Redirecionamentos demais a partir de {url}")
+        if "login.php" in urlparse(url).path:
+            raise SessaoExpirada(f"Redirecionado para o login do SEI ({url})")
+        if resposta.status >= 500:
+            raise ErroServidorHttp(f"HTTP {resposta.status} em {url}")
+        if resposta.status >= 400:
+            raise ErroHttp(f"HTTP {resposta.status} em {url}")
+        return url, decodificar(resposta.data, resposta.headers.get("Content-Type", ""))
+
+    def formulario_pesquisa(self):
+        """Ação, método e campos ocultos do formulário de pesquisa rápida, lidos da tela inicial uma vez por sessão."""
+        with self._lock:
+            if self._pesquisa is not None:
+                return self._pesquisa
+        url, pagina = self.obter(self.url)
+        formularios = interpretar(pagina).xpath("//form[.//input[@id='txtPesquisaRapida']]")
+        if not formularios:
+            raise PaginaRequerJavascript("tela inicial sem o formulário de pesquisa rápida")
+        formulario = formularios[0]
+        campos = {
+            campo.get("name"): campo.get("value", "")
+            for campo in formulario.xpath(".//input[@type='hidden'][@name]")
+        }
+        metodo = (formulario.get("method") or "GET").upper()
+        acao = urljoin(url, formulario.get("action") or url)
+        if metodo == "GET":
+            # Como no navegador, os campos de um formulário GET substituem a query string da ação
+            acao = acao.split("?", 1)[0]
+        pesquisa = (acao, metodo, campos, (formulario.xpath(".//input[@id='txtPesquisaRapida']/@name") or ["txtPesquisaRapida"])[0])
+        with self._lock:
+            self._pesquisa = pesquisa
+        return pesquisa
+
+    def pesquisar(self, process_number):
+        """Envia a pesquisa rápida do processo e retorna (URL, HTML) da tela do processo."""
+        acao, metodo, campos, campo_numero = self.formulario_pesquisa()
+        return self.obter(acao, dict(campos, **{campo_numero: process_number}), metodo)
@@ -0,0 +1,140 @@
+import logging
+import os
+import time
+
+import pandas as pd
+
+# Chave de um item: o mesmo item extraído de novo (reprocessamento, --reiniciar) não é contado duas vezes.
+# Usa o texto original de TAMANHO/GENERO (sem diferenças de caixa, acentos e espaços), e não o
+# TAMANHO normalizado: "M / Masculino" e "M / Feminino" do mesmo Termo são itens diferentes, assim
+# como dois tamanhos que o vocabulário não reconhece
+CHAVE_ITEM = ["PROCESSO", "NOME ARQUIVO", "MATERIAL", "MODELO", "TAMANHO/GENERO"]
+
+# Vocabulário canônico de TAMANHO/GENERO. Os textos são comparados sem acentos e em maiúsculas.
+TAMANHOS = {
+    "PP": "PP", "EXTRA PEQUENO": "PP",
+    "P": "P", "PEQUENO": "P",
+    "M": "M", "MEDIO": "M",
+    "G": "G", "GRANDE": "G",
+    "GG": "GG", "EXTRA GRANDE": "GG",
+    "XG": "XG", "EG": "XG",
+    "XGG": "XGG", "EGG": "XGG", "XXG": "XGG",
+    "U": "UNICO", "UNICO": "UNICO",
+}
+GENEROS = {
+    "MASCULINO": "MASCULINO", "MASC": "MASCULINO", "HOMEM": "MASCULINO",
+    "FEMININO": "FEMININO", "FEM": "FEMININO", "MULHER": "FEMININO",
+    "UNISSEX": "UNISSEX", "UNISEX": "UNISSEX",
+}
+NUMEROS_POR_EXTENSO = {
+    "UM": 1, "UMA": 1, "DOIS": 2, "DUAS": 2, "TRES": 3, "QUATRO": 4, "CINCO": 5,
+    "SEIS": 6, "SETE": 7, "OITO": 8, "NOVE": 9, "DEZ": 10,
+}
+
+
+def _alternativas(termos):
+    # Mais longos primeiro, para "EXTRA GRANDE" vencer "GRANDE" e "GG" vencer "G"
+    return "|".join(sorted(termos, key=len, reverse=True))
+
+
+RE_TAMANHO = rf"\b(\d{{1,3}}|{_alternativas(TAMANHOS)})\b"
+RE_GENERO = rf"\b({_alternativas(GENEROS)})\b"
+RE_NUMERO_POR_EXTENSO = rf"\b({_alternativas(NUMEROS_POR_EXTENSO)})\b"
+
+
+def sem_acentos(coluna):
+    """Maiúsculas, sem acentos e com espaços simples, coluna inteira de uma vez (métodos .str)."""
+    return (coluna.fillna("").astype(str).str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+            .str.upper().str.replace(r"\s+", " ", regex=True).str.strip())
+
+
+def normalizar_quantidade(coluna):
+    """Primeiro número da célula ("2", "02 un", "dois") como inteiro; vazio ou ilegível vira nulo."""
+    texto = sem_acentos(coluna)
+    digitos = pd.to_numeric(texto.str.extract(r"(\d+)", expand=False), errors="coerce")
+    por_extenso = texto.str.extract(RE_NUMERO_POR_EXTENSO, expand=False).map(NUMEROS_POR_EXTENSO)
+    return digitos.fillna(por_extenso).astype("Int64")
+
+
+def normalizar_tamanho_genero(coluna):
+    """Separa TAMANHO/GENERO ("M / Masculino", "42", "G fem") em TAMANHO e GENERO canônicos.
+
+    O gênero é procurado primeiro e retirado do texto, para que o "M" de "M / Masculino" seja
+    lido como tamanho. Retorna um DataFrame com as colunas TAMANHO e GENERO (nulos se ausentes).
+    """
+    texto = sem_acentos(coluna)
+    genero = texto.str.extract(RE_GENERO, expand=False)
+    resto = texto.str.replace(RE_GENERO, " ", regex=True)
+    tamanho = resto.str.extract(RE_TAMANHO, expand=False)
+    # Números (calçados, calças) ficam como estão; siglas e nomes vão para o vocabulário
+    tamanho = tamanho.map(TAMANHOS).fillna(tamanho.str.lstrip("0").replace("", "0"))
+    return pd.DataFrame({"TAMANHO": tamanho, "GENERO": genero.map(GENEROS)}, index=coluna.index)
+
+
+def consolidar(itens):
+    """Tipos, vocabulário canônico e remoção de itens repetidos, sem laços por linha.
+
+    Com o mesmo item extraído mais de uma vez, fica a extração mais recente (a última linha).
+    """
+    texto = {
+        coluna: itens[coluna].fillna("").astype(str).str.replace(r"\s+", " ", regex=True).str.strip()
+        for coluna in ("PROCESSO", "NOME ARQUIVO", "NOME", "MATERIAL", "MODELO")
+    }
+    consolidado = pd.DataFrame(texto, index=itens.index)
+    consolidado = consolidado.join(normalizar_tamanho_genero(itens["TAMANHO/GENERO"]))
+    consolidado["TAMANHO/GENERO ORIGINAL"] = itens["TAMANHO/GENERO"].fillna("").astype(str)
+    consolidado["QUANTIDADE"] = normalizar_quantidade(itens["QUANTIDADE"])
+
+    chave = consolidado[CHAVE_ITEM[:-1]].assign(**{"TAMANHO/GENERO": sem_acentos(itens["TAMANHO/GENERO"])})
+    consolidado = consolidado[~chave.duplicated(keep="last")].reset_index(drop=True)
+    for coluna in ("PROCESSO", "NOME ARQUIVO", "NOME", "MODELO", "TAMANHO/GENERO ORIGINAL"):
+        consolidado[coluna] = consolidado[coluna].astype("string")
+    for coluna in ("MATERIAL", "TAMANHO", "GENERO"):
+        consolidado[coluna] = consolidado[coluna].astype("category")
+    return consolidado
+
+
+def agregar(consolidado):
+    """Totais pré-calculados por material, por material/tamanho/gênero e por funcionário."""
+    def totais(chaves):
+        return (consolidado.groupby(chaves, observed=True, dropna=False)
+                .agg(ITENS=("MODELO", "size"), QUANTIDADE=("QUANTIDADE", "sum"), PROCESSOS=("PROCESSO", "nunique"))
+                .reset_index())
+
+    return {
+        "por_material": totais(["MATERIAL"]),
+        "por_tamanho": totais(["MATERIAL", "TAMANHO", "GENERO"]),
+        "por_funcionario": totais(["NOME"]),
+    }
+
+
+def carregar_itens(excel_path, journal, sheet_name="Itens Extraídos"):
+    """Todos os itens extraídos: a aba da planilha mais os ainda pendentes no journal, lidos uma vez."""
+    partes = []
+    if os.path.exists(excel_path):
+        try:
+            partes.append(pd.read_excel(excel_path, sheet_name=sheet_name, dtype=str, keep_default_na=False))
+        except ValueError:
+            logging.warning(f"Aba {sheet_name} não encontrada em {excel_path}")
+    partes.append(journal.ler())
+    return pd.concat(partes, ignore_index=True).reindex(columns=journal.colunas)
+
+
+def gravar_consolidado(excel_path, journal, destino_dir):
+    """Consolida todos os itens e grava itens.parquet e os agregados em destino_dir. Retorna o número de itens."""
+    inicio = time.perf_counter()
+    itens = carregar_itens(excel_path, journal)
+    consolidado = consolidar(itens)
+    os.makedirs(destino_dir, exist_ok=True)
+    tabelas = dict(agregar(consolidado), itens=consolidado)
+    for nome, tabela in tabelas.items():
+        # Grava em arquivo temporário e troca, para quem estiver lendo nunca ver um arquivo pela metade
+        caminho = os.path.join(destino_dir, f"{nome}.parquet")
+        tabela.to_parquet(f"{caminho}.tmp", index=False)
+        os.replace(f"{caminho}.tmp", caminho)
+    sem_quantidade = int(consolidado["QUANTIDADE"].isna().sum())
+    sem_tamanho = int(consolidado["TAMANHO"].isna().sum())
+    logging.info(f"Consolidação: {len(itens)} linhas, {len(itens) - len(consolidado)} repetidas removidas, "
+                 f"{len(consolidado)} itens ({sem_quantidade} sem quantidade, {sem_tamanho} sem tamanho reconhecido) "
+                 f"gravados em {destino_dir} em {time.perf_counter() - inicio:.1f}s")
+    return len(consolidado)
@@ -0,0 +1,125 @@
+import logging
+import re
+
+# NUP (Portaria Interministerial nº 11/2019): unidade (5) + sequencial (6) + ano (4) + 2 dígitos
+# verificadores. Processos antigos usam o ano com 2 dígitos: 5 + 6 + 2 + 2.
+DIGITOS_NUP = 17
+DIGITOS_NUP_ANTIGO = 15
+RE_NUP_FORMATADO = re.compile(r"^(\d{5})\.?(\d{6})/(\d{4}|\d{2})(?:-(\d{2}))?$")
+
+
+def calcular_dv(digitos):
+    """Dígito verificador módulo 11 do NUP: pesos 2, 3, 4... da direita para a esquerda."""
+    soma = sum(int(digito) * peso for peso, digito in enumerate(reversed(digitos), start=2))
+    dv = 11 - soma % 11
+    # Restos que dariam 10 ou 11 viram 0 e 1
+    return str(dv % 10)
+
+
+def formatar_nup(digitos):
+    """Formata os dígitos do NUP como 00000.000000/0000-00 (ou 00000.000000/00-00)."""
+    return f"{digitos[:5]}.{digitos[5:11]}/{digitos[11:-2]}-{digitos[-2:]}"
+
+
+def gerar_nup(base):
+    """Acrescenta os dois dígitos verificadores à base (13 ou 15 dígitos) e formata o número."""
+    primeiro = calcular_dv(base)
+    return formatar_nup(base + primeiro + calcular_dv(base + primeiro))
+
+
+def normalizar_processo(valor):
+    """Converte o valor da célula no NUP formatado.
+
+    Aceita o número com ou sem pontuação e espaços ("50500 070610 2023 82",
+    "50500070610202382"), inclusive vindo como número do Excel, que perde os zeros à esquerda.
+    Retorna (numero, None) ou (None, motivo) quando o valor não é um NUP válido.
+    """
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    if isinstance(valor, int):
+        digitos = str(valor)
+        digitos = digitos.zfill(DIGITOS_NUP if len(digitos) > DIGITOS_NUP_ANTIGO else DIGITOS_NUP_ANTIGO)
+    else:
+        texto = re.sub(r"\s", "", str(valor))
+        if re.search(r"[^\d.\-/]", texto):
+            return None, "caracteres inválidos"
+        if "/" in texto:
+            # Com a barra, o tamanho do ano define o formato: "50500.070610/2023" não tem os dígitos verificadores
+            partes = RE_NUP_FORMATADO.match(texto)
+            if partes is None:
+                return None, "formato inválido (esperado 00000.000000/0000-00)"
+            if partes.group(4) is None:
+                return None, "sem dígitos verificadores"
+        digitos = re.sub(r"\D", "", texto)
+
+    if len(digitos) not in (DIGITOS_NUP, DIGITOS_NUP_ANTIGO):
+        if len(digitos) in (DIGITOS_NUP - 2, DIGITOS_NUP_ANTIGO - 2):
+            return None, "sem dígitos verificadores"
+        return None, f"{len(digitos)} dígitos (esperado {DIGITOS_NUP} ou {DIGITOS_NUP_ANTIGO})"
+
+    esperado = gerar_nup(digitos[:-2])
+    if esperado[-2:] != digitos[-2:]:
+        return None, f"dígitos verificadores inválidos (esperado {esperado[-2:]})"
+    return esperado, None
+
+
+def ler_processos(excel_path, sheet_name="PROCESSO", coluna="PROCESSO"):
+    """Lê os valores da coluna PROCESSO em modo somente leitura, linha a linha.
+
+    Retorna uma lista de (número da linha na planilha, valor), ignorando células vazias. O modo
+    read_only do openpyxl não carrega a pasta de trabalho inteira na memória, então planilhas
+    de entrada grandes são lidas sem montar um DataFrame.
+    """
+    # Importado aqui: o openpyxl é lido em segundo plano, enquanto a interface já está aberta
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        linhas = workbook[sheet_name].iter_rows(values_only=True)
+        cabecalho = next(linhas, ())
+        indice = next((i for i, nome in enumerate(cabecalho) if str(nome).strip().upper() == coluna), None)
+        if indice is None:
+            raise ValueError(f"Coluna {coluna} não encontrada na aba {sheet_name} de {excel_path}")
+
+        valores = []
+        for numero_linha, linha in enumerate(linhas, start=2):
+            valor = linha[indice] if indice < len(linha) else None
+            if valor is None or not str(valor).strip():
+                continue
+            valores.append((numero_linha, valor))
+        return valores
+    finally:
+        workbook.close()
+
+
+def planejar_entrada(valores):
+    """Normaliza, valida e remove duplicados dos números de processo lidos da planilha.
+
+    Retorna {"validos": [...], "rejeitados": [(linha, valor, motivo)], "duplicados":
+    [(linha, numero, linha da primeira ocorrência)]}; só os válidos, na ordem da planilha e
+    sem repetição, devem ir para o navegador.
+    """
+    validos = []
+    rejeitados = []
+    duplicados = []
+    primeira_linha = {}
+    for numero_linha, valor in valores:
+        numero, motivo = normalizar_processo(valor)
+        if numero is None:
+            rejeitados.append((numero_linha, valor, motivo))
+        elif numero in primeira_linha:
+            duplicados.append((numero_linha, numero, primeira_linha[numero]))
+        else:
+            primeira_linha[numero] = numero_linha
+            validos.append(numero)
+    return {"validos": validos, "rejeitados": rejeitados, "duplicados": duplicados}
+
+
+def registrar_plano(plano):
+    """Registra no log as linhas rejeitadas e duplicadas antes de abrir o navegador."""
+    for numero_linha, valor, motivo in plano["rejeitados"]:
+        logging.warning(f"Linha {numero_linha}: processo '{valor}' ignorado: {motivo}")
+    for numero_linha, numero, original in plano["duplicados"]:
+        logging.info(f"Linha {numero_linha}: processo {numero} repetido (linha {original}); visitado uma vez")
+    logging.info(f"Entrada: {len(plano['validos'])} processos válidos, {len(plano['rejeitados'])} rejeitados, "
+                 f"{len(plano['duplicados'])} duplicados.")
@@ -0,0 +1,140 @@
+import sqlite3
+import threading
+import time
+
+PENDENTE = "pendente"
+CONCLUIDO = "concluido"
+FALHA = "falha"
+
+
+class EstadoExtracao:
+    """Registro persistente (SQLite) do andamento da extração.
+
+    Guarda o status de cada processo e de cada documento (pendente, concluido ou falha),
+    para que uma nova execução visite apenas o que ficou inacabado. Cada alteração é
+    gravada imediatamente, então o estado sobrevive a uma queda do navegador ou ao
+    fechamento da janela de log.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS processos (
+                processo TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                erro TEXT,
+                atualizado_em REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS documentos (
+                processo TEXT NOT NULL,
+                documento TEXT NOT NULL,
+                titulo TEXT NOT NULL,
+                status TEXT NOT NULL,
+                erro TEXT,
+                atualizado_em REAL NOT NULL,
+                PRIMARY KEY (processo, documento)
+            );
+            CREATE TABLE IF NOT EXISTS arvores (
+                processo TEXT NOT NULL,
+                documento TEXT NOT NULL,
+                titulo TEXT NOT NULL,
+                ordem INTEGER NOT NULL,
+                visto_em REAL NOT NULL,
+                PRIMARY KEY (processo, documento)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def registrar_processos(self, processos):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO processos (processo, status, atualizado_em) VALUES (?, ?, ?)",
+                [(processo, PENDENTE, time.time()) for processo in processos],
+            )
+            self._conn.commit()
+
+    def processos_a_visitar(self, processos, somente_falhas=False):
+        """Filtra a lista de entrada, mantendo a ordem, pelos processos ainda não concluídos.
+
+        Com somente_falhas=True retorna apenas os processos marcados como falha.
+        """
+        with self._lock:
+            status = dict(self._conn.execute("SELECT processo, status FROM processos"))
+        if somente_falhas:
+            return [processo for processo in processos if status.get(processo) == FALHA]
+        return [processo for processo in processos if status.get(processo) != CONCLUIDO]
+
+    def marcar_processo(self, processo, status, erro=None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO processos (processo, status, erro, atualizado_em) VALUES (?, ?, ?, ?)",
+                (processo, status, erro, time.time()),
+            )
+            self._conn.commit()
+
+    def documentos_concluidos(self, processo):
+        with self._lock:
+            linhas = self._conn.execute(
+                "SELECT documento FROM documentos WHERE processo = ? AND status = ?", (processo, CONCLUIDO)
+            ).fetchall()
+        return {documento for (documento,) in linhas}
+
+    def documentos_com_status(self, status):
+        """Retorna (processo, documento, titulo) de todos os documentos com o status, de todos os processos."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT processo, documento, titulo FROM documentos WHERE status = ? ORDER BY processo", (status,)
+            ).fetchall()
+
+    def marcar_documentos(self, processo, documentos):
+        """Grava o status de vários documentos de um processo.
+
+        documentos: iterável de tuplas (documento, titulo, status, erro).
+        """
+        agora = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO documentos (processo, documento, titulo, status, erro, atualizado_em) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(processo, documento, titulo, status, erro, agora) for documento, titulo, status, erro in documentos],
+            )
+            self._conn.commit()
+
+    def documentos_vistos(self, processo):
+        """Documentos da árvore do processo já tratados em execuções anteriores (snapshot)."""
+        with self._lock:
+            linhas = self._conn.execute("SELECT documento FROM arvores WHERE processo = ?", (processo,)).fetchall()
+        return {documento for (documento,) in linhas}
+
+    def registrar_arvore(self, processo, documentos):
+        """Acrescenta documentos ao snapshot da árvore do processo.
+
+        documentos: iterável de tuplas (documento, titulo, ordem). Os já registrados são mantidos.
+        """
+        agora = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO arvores (processo, documento, titulo, ordem, visto_em) VALUES (?, ?, ?, ?, ?)",
+                [(processo, documento, titulo, ordem, agora) for documento, titulo, ordem in documentos],
+            )
+            self._conn.commit()
+
+    def resumo(self):
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM processos GROUP BY status"))
+
+    def reiniciar(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM processos")
+            self._conn.execute("DELETE FROM documentos")
+            self._conn.execute("DELETE FROM arvores")
+            self._conn.commit()
+
+    def fechar(self):
+        with self._lock:
+            self._conn.close()
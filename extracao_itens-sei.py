@@ -1,183 +1,952 @@
+import argparse
+import importlib.util
 import logging
+import multiprocessing
 import os
+import queue
 import threading
 import time
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+
+# Referência do tempo de inicialização (interface, navegador e planilha de entrada prontos)
+inicio_programa = time.perf_counter()
+
+# pandas, WebDriverWait/expected_conditions (cliente WebDriver completo) e openpyxl são importados
+# só onde são usados, para que a interface abra antes de carregá-los
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import WebDriverException, NoSuchElementException, TimeoutException
+from selenium.common.exceptions import WebDriverException, NoSuchElementException
 
 from login_sei import SeiLogin
 from login_sei import PromptWindow
+from login_sei import PERFIS, PERFIL_PADRAO, perfis_dir
+from login_sei import carregar_credenciais
+from journal_itens import JournalItens, gravar_aba
+from cache_documentos import CacheDocumentos
+from parser_termo import extrair_conteudo, montar_itens
+from metricas import MedidorEtapas
+from retentativas import PoliticaRetentativa, classificar_erro
+from supervisor_driver import SupervisorDriver
+from prefetch_abas import PrefetchAbas, ABAS_MAX
+from prefetch_abas import totais as totais_prefetch
+from estado_extracao import EstadoExtracao, PENDENTE, CONCLUIDO, FALHA
+from extratores import AGENDADO, ExtratorDom, PendenciasAssincronas
+from entrada_processos import ler_processos, planejar_entrada, registrar_plano
+from cliente_http import ClienteSei, CONEXOES_PADRAO, AlertaSei, PaginaRequerJavascript, SessaoExpirada
+from cliente_http import alerta, nos_arvore, url_iframe
+from logs_estruturados import configurar_logs, contexto_log, definir_contexto
 
 atual_dir = os.path.dirname(os.path.abspath(__file__))
+logs_dir = os.path.join(atual_dir, 'logs')
+log_path = os.path.join(logs_dir, 'extracao_itens_sei.jsonl')
 
-logging.basicConfig(
-    filename=os.path.join(atual_dir, 'extracao_itens_sei.log'),
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Log em JSON Lines com processo, documento e etapa de cada registro, rotacionado e compactado
+# (logs/extracao_itens_sei.jsonl.1.gz, ...). Os processos do pool de OCR importam este módulo de
+# novo e não abrem o arquivo, que só o processo principal rotaciona.
+if multiprocessing.parent_process() is None:
+    configurar_logs(log_path)
 
 sei_url = "http://sei.antt.gov.br/"
 
 excel_path = os.path.join(atual_dir, 'excel', 'itens_extraidos.xlsx')
+journal_path = os.path.join(atual_dir, 'excel', 'itens_extraidos.journal.csv')
+consolidado_dir = os.path.join(atual_dir, 'consolidado')
+# Aba gravada por --offline, separada de 'Itens Extraídos' para que a reconstrução não apague itens
+ABA_RECONSTRUIDA = 'Itens Reconstruídos'
+estado_path = os.path.join(atual_dir, 'excel', 'estado_extracao.sqlite')
+cache_dir = os.path.join(atual_dir, 'cache_documentos')
 chromedriver_path = os.path.join(atual_dir, 'chromedriver-win64', 'chromedriver.exe')
 download_dir = os.path.join(atual_dir, 'downloads')
 if not os.path.exists(download_dir):
     os.makedirs(download_dir)
 
-df = pd.read_excel(excel_path, sheet_name='PROCESSO').dropna(subset=['PROCESSO'])
-df = df[df['PROCESSO'].str.strip() != '']  # Remove strings vazias ou com espaços
-process_numbers = df['PROCESSO'].tolist()
+# Processos válidos e sem repetição da aba PROCESSO (lidos e validados em preparar_entrada)
+process_numbers = []
 
 chrome_options = Options()
 
-def encontrar_arquivos():
-    sei.driver.get(sei_url)
-    colunas = ["PROCESSO", "NOME ARQUIVO", "NOME", "MATERIAL", "MODELO", "TAMANHO/GENERO", "QUANTIDADE"]
-    
+colunas = ["PROCESSO", "NOME ARQUIVO", "NOME", "MATERIAL", "MODELO", "TAMANHO/GENERO", "QUANTIDADE"]
+
+# Itens extraídos são acrescentados ao journal a cada processo e gravados na planilha ao final
+journal = JournalItens(journal_path, colunas)
+
+# Andamento de cada processo/documento, usado para retomar execuções interrompidas (aberto no __main__)
+estado = None
+
+# Prazos (s) de um documento e de um processo; ao estourar, o Chrome da sessão é reiniciado (0 desativa)
+prazo_documento_s = 120
+prazo_processo_s = 900
+supervisor = SupervisorDriver()
+
+# Extratores aplicados a cada Termo aberto, em ordem; o seguinte só é usado se o anterior não
+# encontrar itens (com --ocr: texto do documento e, na falta de itens, OCR das capturas)
+extratores = [ExtratorDom()]
+
+# Processos com documentos ainda no pool de OCR (criado no __main__, junto com o estado)
+pendencias = None
+
+# Pool de OCR usado pelo ExtratorOcr; None sem --ocr
+pipeline_ocr = None
+
+# Com --abas K > 1, os próximos Termos do processo são pré-carregados em K abas de cada navegador
+abas_prefetch = 1
+prefetch_por_sessao = {}
+
+# Com --delta, reabre também os processos concluídos, mas só os documentos ausentes do snapshot da árvore
+modo_delta = False
+
+# Com --http, árvore e documentos são baixados direto do SEI com os cookies do navegador; o
+# navegador fica para o login e para os processos cujas páginas dependem de JavaScript
+cliente_http = None
+
+# HTML bruto dos Termos para reprocessamento offline; None desativa o cache
+cache = None
+
+# Novas tentativas com backoff para erros transitórios, com orçamento por processo e por execução
+politica = PoliticaRetentativa()
+
+# Tempos por etapa de cada processo, gravados em logs/tempos_<data>.jsonl
+medidor = MedidorEtapas(os.path.join(logs_dir, f"tempos_{time.strftime('%Y%m%d_%H%M%S')}.jsonl"))
+
+# Lê título e URL de todos os nós da árvore (ifrArvore/frmArvore) sem trocar de frame.
+# Retorna null enquanto a árvore não terminou de carregar, para uso dentro do WebDriverWait.
+JS_SNAPSHOT_ARVORE = """
+const frame = document.getElementById('ifrArvore');
+const doc = frame && frame.contentDocument;
+const form = doc && doc.getElementById('frmArvore');
+if (!form) {
+    return null;
+}
+return Array.from(form.querySelectorAll('a'), (a) => ({
+    titulo: (a.innerText || a.textContent || '').trim(),
+    href: a.href || ''
+}));
+"""
+
+# URL do conteúdo do documento (ifrArvoreHtml) na página de visualização
+JS_URL_DOCUMENTO = """
+const frame = document.getElementById('ifrArvoreHtml');
+return frame && frame.src ? frame.src : null;
+"""
+
+# HTML completo do Termo em uma única chamada ao navegador; nome e itens são lidos
+# localmente por parser_termo, em vez de uma requisição WebDriver por linha e por célula.
+JS_HTML_DOCUMENTO = "return document.documentElement.outerHTML;"
+
+def preparar_excel():
+    import pandas as pd
+
     if not os.path.exists(excel_path):
         df_cabecalho = pd.DataFrame(columns=colunas)
         df_cabecalho.to_excel(excel_path, index=False, sheet_name='Itens Extraídos')
         logging.info(f"Arquivo Excel criado em: {excel_path}")
 
-    for process_number in process_numbers:
-        processo_itens_extraidos = []
+# Diagnóstico: id, name e src de todos os iframes da página em uma única chamada
+JS_DIAGNOSTICO_FRAMES = "return Array.from(document.querySelectorAll('iframe'), (f) => [f.id, f.name, f.src]);"
+
+def diagnosticar_frames(sei):
+    """Registra os iframes da página atual; só consulta o navegador com o nível DEBUG ativo."""
+    if not logging.getLogger().isEnabledFor(logging.DEBUG):
+        return
+    try:
+        frames = sei.driver.execute_script(JS_DIAGNOSTICO_FRAMES)
+        logging.debug("%d iframes na página %s: %s", len(frames), sei.driver.current_url, frames)
+    except WebDriverException as e:
+        logging.debug("Erro ao listar iframes: %s", e)
+
+def eh_termo(documento):
+    return documento["titulo"].startswith("Termo")
+
+def chave_documento(documento):
+    """Identifica o documento no estado: id_documento da URL ou, na falta dele, o título."""
+    return documento["id"] or documento["titulo"]
+
+def id_documento(href):
+    """Retorna o id_documento da URL de um nó da árvore do processo, ou "" se não houver."""
+    return parse_qs(urlparse(href).query).get("id_documento", [""])[0]
+
+def documentos_da_arvore(nos):
+    return [
+        {"titulo": no["titulo"], "href": no["href"], "id": id_documento(no["href"]), "ordem": ordem}
+        for ordem, no in enumerate(nos)
+        if no["href"].startswith("http")
+    ]
+
+def obter_arvore(sei):
+    """Retorna título, URL e id de todos os documentos da árvore do processo em uma única chamada."""
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    return documentos_da_arvore(WebDriverWait(sei.driver, 10).until(lambda d: d.execute_script(JS_SNAPSHOT_ARVORE)))
+
+def abrir_documento(sei, href, tempos):
+    """Carrega o conteúdo do documento diretamente na janela principal, sem trocar de frame."""
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    with tempos.etapa("abrir_documento"):
+        sei.driver.get(href)
+    # Substitui a antiga troca para ifrVisualizacao/ifrArvoreHtml
+    with tempos.etapa("carregar_conteudo"):
+        url_conteudo = WebDriverWait(sei.driver, 10).until(lambda d: d.execute_script(JS_URL_DOCUMENTO))
+        sei.driver.get(url_conteudo)
+
+def pesquisar_processo(sei, process_number, tempos):
+    """Abre o processo pela pesquisa rápida e retorna a árvore de documentos."""
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    with tempos.etapa("pesquisa_rapida"):
+        WebDriverWait(sei.driver, 10).until(
+            EC.presence_of_element_located((By.ID, 'txtPesquisaRapida'))
+        ).send_keys(process_number + Keys.RETURN)
+
+    with tempos.etapa("carregar_arvore"):
+        return obter_arvore(sei)
+
+def ler_documento(sei, documento, tempos):
+    """Abre o documento e retorna o HTML do seu conteúdo."""
+    abrir_documento(sei, documento["href"], tempos)
+    with tempos.etapa("extrair_tabela"):
+        return sei.driver.execute_script(JS_HTML_DOCUMENTO)
+
+def pesquisar_processo_http(http, process_number, tempos):
+    """Como pesquisar_processo, mas por HTTP: pesquisa rápida, tela do processo e árvore (ifrArvore)."""
+    with tempos.etapa("pesquisa_rapida"):
+        url, pagina = http.pesquisar(process_number)
+        url_arvore = url_iframe(pagina, url, "ifrArvore")
+        if url_arvore is None:
+            mensagem = alerta(pagina)
+            if mensagem is not None:
+                raise AlertaSei(mensagem)
+            raise PaginaRequerJavascript("tela do processo sem o iframe ifrArvore")
+
+    with tempos.etapa("carregar_arvore"):
+        url, pagina = http.obter(url_arvore)
+        return documentos_da_arvore(nos_arvore(pagina, url))
+
+def ler_documento_http(http, documento, tempos):
+    """Como ler_documento, mas por HTTP: visualização do documento e, nela, o conteúdo (ifrArvoreHtml)."""
+    with tempos.etapa("abrir_documento"):
+        url, pagina = http.obter(documento["href"])
+    with tempos.etapa("carregar_conteudo"):
+        url_conteudo = url_iframe(pagina, url, "ifrArvoreHtml")
+        if url_conteudo is None:
+            raise PaginaRequerJavascript(f"visualização do documento {documento['titulo']} sem o iframe ifrArvoreHtml")
+        return http.obter(url_conteudo)[1]
+
+def extrair_documento(sei, process_number, documento, html, tempos):
+    """Passa o Termo aberto pelos extratores registrados até um deles encontrar itens.
+
+    Retorna o conteúdo ({"nome", "linhas"}) do primeiro extrator que encontrar itens (ou do
+    último, se nenhum encontrar), ou AGENDADO se o documento foi entregue a um extrator
+    assíncrono, que registra o resultado no journal e no estado ao terminar. O nome já
+    encontrado por um extrator anterior é repassado aos seguintes.
+    """
+    chave = chave_documento(documento)
+    conteudo = {"nome": "", "linhas": []}
+    for extrator in extratores:
+        if extrator.assincrono:
+            pendencias.agendar(process_number)
         try:
-            WebDriverWait(sei.driver, 10).until(
-                EC.presence_of_element_located((By.ID, 'txtPesquisaRapida'))
-            ).send_keys(process_number + Keys.RETURN)
+            with tempos.etapa(f"extrator_{extrator.nome}"):
+                resultado = extrator.extrair(
+                    sei, process_number, documento, html,
+                    lambda itens, erro: pendencias.concluir_documento(process_number, chave, documento["titulo"], erro),
+                    nome_funcionario=conteudo["nome"],
+                )
+        except Exception:
+            if extrator.assincrono:
+                pendencias.cancelar(process_number)
+            raise
+        if resultado == AGENDADO:
+            logging.info(f"Documento {documento['titulo']} sem itens no texto; enviado ao extrator {extrator.nome}")
+            return AGENDADO
+        if extrator.assincrono:
+            pendencias.cancelar(process_number)
+        if resultado["nome"] and not conteudo["nome"]:
+            conteudo["nome"] = resultado["nome"]
+        conteudo["linhas"] = resultado["linhas"]
+        if montar_itens(process_number, documento["titulo"], "", resultado["linhas"]):
+            break
+    return conteudo
+
+def obter_prefetch(sei):
+    """Abas de pré-carregamento da sessão, recriadas se o navegador tiver sido reiniciado; None com --abas 1."""
+    if abas_prefetch <= 1:
+        return None
+    prefetch = prefetch_por_sessao.get(id(sei))
+    if prefetch is None or prefetch.driver is not sei.driver:
+        if prefetch is not None:
+            # Navegador reiniciado pelo supervisor: as abas antigas foram junto
+            prefetch.fechar(abas=False)
+        prefetch = prefetch_por_sessao[id(sei)] = PrefetchAbas(sei.driver, abas_prefetch)
+    return prefetch
 
-            frame_lista = WebDriverWait(sei.driver, 10).until(
-                lambda d: d.find_element(By.ID, "ifrArvore")
+def encerrar_prefetch(sei):
+    """Fecha as abas de pré-carregamento da sessão ao fim do seu lote, registrando acertos e falhas."""
+    prefetch = prefetch_por_sessao.pop(id(sei), None)
+    if prefetch is not None:
+        prefetch.fechar(abas=prefetch.driver is sei.driver)
+
+def descrever_erro(erro):
+    return f"[{getattr(erro, 'classificacao', classificar_erro(erro))}] {erro}"
+
+def extrair_processo(sei, process_number, tempos, orcamento, ignorar=(), http=None):
+    """Extrai os itens dos Termos do processo que ainda não constam como concluídos no estado.
+
+    Documentos cuja chave está em ignorar não são abertos. Com http (ClienteSei), a árvore e os
+    documentos são baixados por HTTP; PaginaRequerJavascript e SessaoExpirada são propagadas.
+
+    Retorna um dicionário com os itens extraídos, o status de cada documento visitado
+    (tuplas documento, titulo, status, erro) e o erro que interrompeu o processo, se houver.
+    """
+    processo_itens_extraidos = []
+    documentos = []
+    resultado = {"itens": processo_itens_extraidos, "documentos": documentos, "arvore": [], "erro": None}
+    navegou = False
+    try:
+        if http is not None:
+            arvore = politica.executar(
+                lambda: pesquisar_processo_http(http, process_number, tempos),
+                f"Processo {process_number}", orcamento,
             )
-            sei.driver.switch_to.frame(frame_lista)
-            frm_arvore = WebDriverWait(sei.driver, 10).until(
-                EC.presence_of_element_located((By.ID, 'frmArvore'))
+        else:
+            arvore = politica.executar(
+                lambda: pesquisar_processo(sei, process_number, tempos),
+                f"Processo {process_number}", orcamento,
+                antes_de_repetir=lambda: sei.driver.get(sei_url),
+                desistir=lambda: supervisor.travado(sei),
             )
-            itens_form = frm_arvore.find_elements(By.TAG_NAME, 'a')
-            termos_encontrados = [item for item in itens_form if item.text.strip().startswith("Termo")]
-            if termos_encontrados:
-                nome_funcionario = ""
-                logging.info(f"Processando termo: {len(termos_encontrados)} para o processo {process_number}")
+        resultado["arvore"] = arvore
+        with tempos.etapa("filtrar_termos"):
+            termos_encontrados = [documento for documento in arvore if eh_termo(documento)]
+            concluidos = estado.documentos_concluidos(process_number) | set(ignorar)
+            if concluidos:
+                termos_encontrados = [documento for documento in termos_encontrados
+                                      if chave_documento(documento) not in concluidos]
+                logging.info(f"{len(concluidos)} documentos do processo {process_number} já concluídos em execução anterior")
+            if modo_delta:
+                vistos = estado.documentos_vistos(process_number)
+                novos = [documento for documento in arvore if chave_documento(documento) not in vistos]
+                termos_encontrados = [documento for documento in termos_encontrados
+                                      if chave_documento(documento) not in vistos]
+                logging.info(f"Processo {process_number}: {len(novos)} documentos novos desde a última execução, "
+                             f"{len(termos_encontrados)} Termos a extrair")
+        if termos_encontrados:
+            nome_funcionario = ""
+            logging.info(f"Processando termo: {len(termos_encontrados)} para o processo {process_number}")
+            prefetch = obter_prefetch(sei) if http is None else None
+            if prefetch is not None:
+                prefetch.iniciar(termos_encontrados)
 
-                for idx, item_form in enumerate(termos_encontrados):
-                    try:
-                        documento_titulo = item_form.text.strip()
-                        logging.info(f"Processando documento: {idx+1}/{len(termos_encontrados)} - {documento_titulo}")
-
-                        item_form.click()
-                        
-                        sei.driver.switch_to.default_content()
-                        try:
-                            all_iframes = sei.driver.find_elements(By.TAG_NAME, 'iframe')
-                            logging.info(f"Numer de iframes encontrados após default_content: {len(all_iframes)}")
-                            for index, iframe_tag in enumerate(all_iframes):
-                                iframe_id = iframe_tag.get_attribute("id")
-                                iframe_name = iframe_tag.get_attribute("name")
-                                logging.info(f"Iframe {index}: ID = {iframe_id}, Name = {iframe_name}")
-                        except Exception as e:
-                            logging.error(f"Erro ao listar iframes: {e}")
+            for idx, documento in enumerate(termos_encontrados):
+                if supervisor.travado(sei):
+                    # Navegador encerrado pelo supervisor: os documentos restantes ficam para a retomada
+                    break
+                chave = chave_documento(documento)
+                definir_contexto(documento=documento["titulo"])
+                try:
+                    documento_titulo = documento["titulo"]
+                    logging.info(f"Processando documento: {idx+1}/{len(termos_encontrados)} - {documento_titulo}")
 
-                        try:
-                            frame_visualizacao = WebDriverWait(sei.driver, 10).until(
-                                EC.presence_of_element_located((By.ID, "ifrVisualizacao"))
-                            )
-                            logging.info(f"Attempting to switch to content visualization frame: {frame_visualizacao.get_attribute('id')}")
-                            sei.driver.switch_to.frame(frame_visualizacao)
-                            logging.info("Successfully switched to ifrVisualizacao.")
-
-                            frame_lista = WebDriverWait(sei.driver, 10).until(
-                                EC.presence_of_element_located((By.ID, "ifrArvoreHtml")) 
-                            )
-                            logging.info(f"Attempting to switch to nested document content frame: {frame_lista.get_attribute('id')}")
-                            sei.driver.switch_to.frame(frame_lista)
-                            logging.info("Successfully switched to ifrArvoreHtml (presumably inside ifrVisualizacao).")
-
-                        except (TimeoutException, NoSuchElementException) as e_iframe_switch:
-                            logging.error(f"Error switching to content iframes (ifrVisualizacao or ifrArvoreHtml): {e_iframe_switch}")
-                            raise 
+                    if http is not None:
+                        html = politica.executar(
+                            lambda: ler_documento_http(http, documento, tempos),
+                            f"Documento {documento_titulo} do processo {process_number}", orcamento,
+                        )
+                    else:
+                        with supervisor.prazo(sei, f"Documento {documento_titulo} do processo {process_number}", prazo_documento_s):
+                            html = None
+                            if prefetch is not None:
+                                with tempos.etapa("aguardar_prefetch"):
+                                    html = prefetch.obter(documento)
+                                if html is not None:
+                                    # A página renderizada fica na aba de pré-carregamento (usada pelo OCR)
+                                    documento = dict(documento, aba=(prefetch.aba_entregue(), prefetch.controle))
+                            if html is None:
+                                navegou = True
+                                html = politica.executar(
+                                    lambda: ler_documento(sei, documento, tempos),
+                                    f"Documento {documento_titulo} do processo {process_number}", orcamento,
+                                    desistir=lambda: supervisor.travado(sei),
+                                )
 
+                    if cache is not None:
                         try:
-                            xpath_for_name = "//td[p[@class='Texto_Justificado' and normalize-space(.) = 'NOME:']]/following-sibling::td[1]/p[@class='Texto_Justificado']"
-                            nome_funcionario_element = sei.driver.find_element(By.CLASS_NAME, xpath_for_name)
-                            nome_funcionario = nome_funcionario_element.text.strip()
-                            logging.info(f"Nome do funcionário encontrado: {nome_funcionario}")
-                            df.loc[df['PROCESSO'] == process_number, 'NOME FUNCIONARIO'] = nome_funcionario
+                            cache.salvar(process_number, chave, documento_titulo, documento["ordem"], html)
                         except Exception as e:
-                            logging.error(f"Erro ao localizar nome do funcionário para o processo {process_number}: {e}")
+                            logging.error(f"Erro ao salvar o documento {documento_titulo} no cache: {e}")
 
-                        try:
-                            linhas_tabela = sei.driver.find_elements(By.XPATH, "//table//tr[position()>1]")
-                            for linha in linhas_tabela:
-                                celulas = linha.find_elements(By.TAG_NAME, 'td')
-                                if len(celulas) >= 3 and celulas[1].text.strip():
-                                    material = celulas[0].text.strip()
-                                    modelo = celulas[1].text.strip()
-                                    tamanho = celulas[2].text.strip()
-                                    quantidade = ""
-
-                                    if len(celulas) > 3:
-                                        quantidade = celulas[3].text.strip()
-                                    
-                                    if modelo or tamanho or quantidade:
-                                        itens_info ={
-                                            "PROCESSO": process_number,
-                                            "NOME ARQUIVO": documento_titulo,
-                                            "NOME": nome_funcionario,
-                                            "MATERIAL": material,
-                                            "MODELO": modelo,
-                                            "TAMANHO/GENERO": tamanho,
-                                            "QUANTIDADE": quantidade
-                                        }
-                                        processo_itens_extraidos.append(itens_info)
-                        
-                        except (Exception,WebDriverException) as e:
-                            logging.error(f"Erro ao extrair itens do processo {process_number}: {e}")
-                            sei.driver.switch_to.default_content()
-                        
-                    except (Exception, WebDriverException) as e:
-                        logging.error(f"Erro ao processar o item {idx+1} do processo {process_number}: {e}")
-                        sei.driver.switch_to.default_content()
-                        
+                    try:
+                        with supervisor.prazo(sei, f"Extração do documento {documento_titulo}", prazo_documento_s):
+                            conteudo = extrair_documento(sei, process_number, documento, html, tempos)
+                    except Exception as e:
+                        logging.error(f"Erro ao extrair itens do processo {process_number}: {e}")
+                        documentos.append((chave, documento_titulo, FALHA, descrever_erro(e)))
                         continue
-                else:
-                    logging.info(f"Nenhum termo encontrado para o processo {process_number}")
-        except (WebDriverException,TimeoutError, Exception, NoSuchElementException) as e:
-            logging.error(f"Erro ao processar o número do processo {process_number}: {e}")
-            continue
-        finally:
-            if processo_itens_extraidos:
-                try:
-                    if os.path.exists(excel_path):
-                        df_existente = pd.read_excel(excel_path, sheet_name='Itens Extraídos')
-                        df_novos = pd.DataFrame(processo_itens_extraidos)
-                        df_final = pd.concat([df_existente, df_novos], ignore_index=True)
+                    if conteudo == AGENDADO:
+                        documentos.append((chave, documento_titulo, PENDENTE, None))
+                        continue
+
+                    if conteudo["nome"]:
+                        nome_funcionario = conteudo["nome"]
+                        logging.info(f"Nome do funcionário encontrado: {nome_funcionario}")
                     else:
-                        df_final = pd.DataFrame(processo_itens_extraidos)
+                        logging.error(f"Erro ao localizar nome do funcionário para o processo {process_number}: campo NOME não encontrado")
+
+                    processo_itens_extraidos.extend(
+                        montar_itens(process_number, documento_titulo, nome_funcionario, conteudo["linhas"])
+                    )
+                    documentos.append((chave, documento_titulo, CONCLUIDO, None))
                     
-                    df_final.to_excel(excel_path, index=False, sheet_name='Itens Extraídos')
-                    logging.info(f"Salvos {len(processo_itens_extraidos)} intes do processo {process_number}")
-                
-                except Exception as e:
-                    backup_path = os.path.join(atual_dir, 'excel', f'backup_{process_number}_{int(time.time())}.xlsx')
-                    pd.Dataframe(processo_itens_extraidos).to_excel(backup_path, index=False)
-                    logging.error(f"Erro ao salvar os itens extraídos do processo {process_number} no Excel: {backup_path}")
-            
-            sei.driver.switch_to.default_content()
+                except (PaginaRequerJavascript, SessaoExpirada):
+                    raise
+                except (Exception, WebDriverException) as e:
+                    logging.error(f"Erro ao processar o item {idx+1} do processo {process_number}: {e}")
+                    if http is None:
+                        diagnosticar_frames(sei)
+                    documentos.append((chave, documento["titulo"], FALHA, descrever_erro(e)))
+                    continue
+        else:
+            logging.info(f"Nenhum termo encontrado para o processo {process_number}")
+    except (PaginaRequerJavascript, SessaoExpirada):
+        raise
+    except (WebDriverException,TimeoutError, Exception, NoSuchElementException) as e:
+        logging.error(f"Erro ao processar o número do processo {process_number}: {e}")
+        resultado["erro"] = descrever_erro(e)
+    finally:
+        definir_contexto(documento=None)
+        # Os documentos são abertos na janela principal; volta à tela inicial para a próxima pesquisa rápida
+        # Com o navegador encerrado pelo supervisor não há para onde voltar: a sessão será reiniciada
+        if navegou and not supervisor.travado(sei):
+            try:
+                with tempos.etapa("voltar_inicio"):
+                    sei.driver.get(sei_url)
+            except Exception as e:
+                logging.error(f"Erro ao retornar à tela inicial do SEI: {e}")
+
+    return resultado
+
+def salvar_itens(process_number, processo_itens_extraidos):
+    """Acrescenta os itens ao journal. Retorna False se for preciso recorrer ao backup."""
+    if not processo_itens_extraidos:
+        return True
+    try:
+        journal.adicionar(processo_itens_extraidos)
+        logging.info(f"Salvos {len(processo_itens_extraidos)} intes do processo {process_number}")
+        return True
+    except Exception as e:
+        import pandas as pd
+
+        backup_path = os.path.join(atual_dir, 'excel', f'backup_{process_number}_{int(time.time())}.xlsx')
+        pd.DataFrame(processo_itens_extraidos).to_excel(backup_path, index=False)
+        logging.error(f"Erro ao salvar os itens extraídos do processo {process_number} no journal ({e}): {backup_path}")
+        return False
+
+def extrair_supervisionado(sei, process_number, tempos, orcamento, ignorar=()):
+    with supervisor.prazo(sei, f"Processo {process_number}", prazo_processo_s):
+        return extrair_processo(sei, process_number, tempos, orcamento, ignorar)
+
+def retomar_apos_travamento(sei, process_number, tempos, orcamento, resultado):
+    """Reinicia o navegador encerrado pelo supervisor e continua o processo do documento seguinte.
+
+    Os documentos já tratados (inclusive o que travou, registrado como falha) são mantidos e
+    não são abertos de novo. Cada processo tem uma única retomada; se travar de novo, o
+    navegador é reiniciado só para os próximos processos.
+    """
+    retomado = False
+    travamento = supervisor.consumir_travamento(sei)
+    while travamento is not None:
+        descricao, parado = travamento
+        with tempos.etapa("reiniciar_navegador"):
+            reiniciado = supervisor.reiniciar(sei)
+        registrar_logins(sei)
+        medidor.registrar("travamento", parado, processo=process_number, etapa=descricao, reiniciado=reiniciado)
+        if not reiniciado or retomado:
+            break
+        retomado = True
+        logging.info(f"Retomando o processo {process_number} após reiniciar o navegador")
+        continuacao = extrair_supervisionado(sei, process_number, tempos, orcamento,
+                                             ignorar={documento for documento, _, _, _ in resultado["documentos"]})
+        resultado = {
+            "itens": resultado["itens"] + continuacao["itens"],
+            "documentos": resultado["documentos"] + continuacao["documentos"],
+            "arvore": continuacao["arvore"] or resultado["arvore"],
+            "erro": continuacao["erro"],
+        }
+        travamento = supervisor.consumir_travamento(sei)
+    return resultado
+
+def processar(sei, process_number):
+    """Extrai, salva e registra no estado o resultado de um processo.
+
+    O estado só é atualizado depois que os itens estão no journal, para que uma queda
+    entre as duas etapas faça o processo ser extraído de novo em vez de perdê-lo.
+    """
+    with contexto_log(processo=process_number):
+        tempos = medidor.processo(process_number)
+        orcamento = politica.orcamento_processo()
+        resultado = extrair_supervisionado(sei, process_number, tempos, orcamento)
+        if supervisor.travado(sei):
+            resultado = retomar_apos_travamento(sei, process_number, tempos, orcamento, resultado)
+        falhou = resultado["erro"] is not None or any(status == FALHA for _, _, status, _ in resultado["documentos"])
+        if falhou and sei.sessao_expirada():
+            # Sessão expirada no meio do lote: novo login automático e nova tentativa do processo
+            with tempos.etapa("relogin"):
+                relogado = sei.relogar()
+            registrar_logins(sei)
+            if relogado:
+                # O estado ainda não registrou este processo, então a nova tentativa refaz todos os
+                # Termos pendentes e substitui o resultado parcial
+                logging.info(f"Repetindo o processo {process_number} após novo login")
+                # Documentos já entregues ao OCR não são capturados de novo
+                agendados = [documento for documento in resultado["documentos"] if documento[2] == PENDENTE]
+                resultado = extrair_supervisionado(sei, process_number, tempos, orcamento,
+                                                   ignorar={documento for documento, _, _, _ in agendados})
+                resultado["documentos"][:0] = agendados
+                if supervisor.travado(sei):
+                    resultado = retomar_apos_travamento(sei, process_number, tempos, orcamento, resultado)
+        registrar_resultado(process_number, tempos, resultado)
+
+def extrair_processo_http(sei, process_number, tempos, orcamento):
+    """Extrai o processo só por HTTP, com os cookies do navegador copiados para cliente_http.
+
+    Retorna None se alguma página depender de JavaScript. Se a sessão tiver expirado, refaz o
+    login no navegador, copia os novos cookies e repete o processo uma vez.
+    """
+    for tentativa in range(2):
+        try:
+            return extrair_processo(sei, process_number, tempos, orcamento, http=cliente_http)
+        except PaginaRequerJavascript as e:
+            logging.info(f"Processo {process_number}: {e}; será extraído pelo navegador")
+            return None
+        except SessaoExpirada as e:
+            logging.warning(f"Processo {process_number}: {e}")
+            erro = e
+            if tentativa:
+                break
+            # relogar() é serializado e não refaz o login se outra thread já o refez
+            with tempos.etapa("relogin"):
+                relogado = sei.relogar()
+            registrar_logins(sei)
+            if not relogado:
+                break
+            cliente_http.copiar_cookies(sei.driver)
+            logging.info(f"Repetindo o processo {process_number} após novo login")
+    return {"itens": [], "documentos": [], "arvore": [], "erro": descrever_erro(erro)}
+
+def processar_http(sei, process_number):
+    """Como processar(), mas só por HTTP; retorna False, sem registrar nada, se o processo precisar do navegador."""
+    with contexto_log(processo=process_number):
+        tempos = medidor.processo(process_number)
+        resultado = extrair_processo_http(sei, process_number, tempos, politica.orcamento_processo())
+        if resultado is None:
+            return False
+        registrar_resultado(process_number, tempos, resultado)
+        return True
+
+def registrar_resultado(process_number, tempos, resultado):
+    """Grava os itens no journal e, depois deles, o status do processo e o snapshot da árvore."""
+    documentos = resultado["documentos"]
+    with tempos.etapa("salvar_itens"):
+        salvo = salvar_itens(process_number, resultado["itens"])
+    if not salvo:
+        documentos = [(documento, titulo, status if status == PENDENTE else FALHA, "Itens não gravados no journal")
+                      for documento, titulo, status, _ in documentos]
+
+    status = pendencias.finalizar_processo(process_number, documentos, resultado["erro"])
+    # Registro com o status final, lido por analisar_logs.py; com OCR pendente, o status final é
+    # registrado por PendenciasAssincronas quando o último documento termina
+    falhas = sum(1 for _, _, status_documento, _ in documentos if status_documento == FALHA)
+    logging.log(logging.ERROR if status == FALHA else logging.INFO,
+                f"Processo {process_number}: {status} ({len(resultado['itens'])} itens, {falhas} documentos com falha)",
+                extra={"processo": process_number, "status": status,
+                       "erro": resultado["erro"] or next((erro for _, _, _, erro in documentos if erro), None)})
+    # Snapshot da árvore: documentos que não são Termos e Termos concluídos; os que falharam ficam
+    # de fora e voltam a ser "novos" no próximo --delta
+    concluidos = estado.documentos_concluidos(process_number)
+    estado.registrar_arvore(process_number, [
+        (chave_documento(documento), documento["titulo"], documento["ordem"])
+        for documento in resultado["arvore"]
+        if not eh_termo(documento) or chave_documento(documento) in concluidos
+    ])
+    medidor.concluir(tempos, status)
+
+def reconstruir_do_cache():
+    """Refaz os itens apenas com o HTML dos Termos guardado em cache, sem navegador.
+
+    O resultado vai para a aba 'Itens Reconstruídos', sem tocar em 'Itens Extraídos': o cache
+    pode não ter todos os documentos (limite de espaço) e os Termos lidos por OCR não rendem
+    itens pelo HTML. Os documentos concluídos no estado que ficaram sem itens na reconstrução
+    são apontados no log.
+    """
+    import pandas as pd
+
+    inicio = time.perf_counter()
+    processo_itens_extraidos = []
+    nome_funcionario = {}
+    com_itens = set()
+    documentos = cache.listar()
+    for process_number, documento, documento_titulo in documentos:
+        html = cache.obter(process_number, documento)
+        if html is None:
+            continue
+        try:
+            conteudo = extrair_conteudo(html)
+        except Exception as e:
+            logging.error(f"Erro ao interpretar o documento {documento_titulo} do processo {process_number}: {e}")
+            continue
+        if conteudo["nome"]:
+            nome_funcionario[process_number] = conteudo["nome"]
+        if conteudo["linhas"]:
+            com_itens.add((process_number, documento))
+        processo_itens_extraidos.extend(
+            montar_itens(process_number, documento_titulo, nome_funcionario.get(process_number, ""), conteudo["linhas"])
+        )
+
+    gravar_aba(excel_path, pd.DataFrame(processo_itens_extraidos, columns=colunas), ABA_RECONSTRUIDA)
+    logging.info(f"Itens reconstruídos a partir do cache na aba {ABA_RECONSTRUIDA}: {len(processo_itens_extraidos)} itens de "
+                 f"{len(documentos)} documentos em {time.perf_counter() - inicio:.1f}s")
+    if os.path.exists(estado_path):
+        estado_anterior = EstadoExtracao(estado_path)
+        try:
+            concluidos = estado_anterior.documentos_com_status(CONCLUIDO)
+        finally:
+            estado_anterior.fechar()
+        em_cache = {(process_number, documento) for process_number, documento, _ in documentos}
+        fora_do_cache = [documento for documento in concluidos if documento[:2] not in em_cache]
+        sem_itens = [documento for documento in concluidos if documento[:2] in em_cache and documento[:2] not in com_itens]
+        for descricao, faltando in (("fora do cache", fora_do_cache), ("sem itens no HTML (ex.: lidos por OCR)", sem_itens)):
+            if faltando:
+                exemplos = ", ".join(f"{titulo} ({process_number})" for process_number, _, titulo in faltando[:5])
+                logging.warning(f"{len(faltando)} documentos concluídos estão {descricao} e não constam da aba "
+                                f"{ABA_RECONSTRUIDA}: {exemplos}{', ...' if len(faltando) > 5 else ''}")
+
+def materializar_planilha():
+    if pipeline_ocr is not None:
+        # Os itens do OCR ainda em andamento precisam estar no journal antes de gravar a planilha
+        pipeline_ocr.encerrar()
+    inicio = time.perf_counter()
+    journal.materializar(excel_path)
+    medidor.registrar("materializar_planilha", time.perf_counter() - inicio)
+
+def registrar_logins(sei):
+    """Leva ao relatório de tempos as autenticações feitas pela sessão."""
+    for duracao, sucesso in sei.tempos_login:
+        medidor.registrar("login", duracao, sucesso=sucesso)
+    sei.tempos_login.clear()
+
+def encontrar_arquivos(sei, processos):
+    sei.driver.get(sei_url)
+    preparar_excel()
+
+    for process_number in processos:
+        processar(sei, process_number)
+        time.sleep(1)
+    encerrar_prefetch(sei)
+
+    materializar_planilha()
+
+def encontrar_arquivos_http(sei, processos):
+    """Extrai os processos por HTTP, até cliente_http.conexoes ao mesmo tempo.
+
+    Os processos cujas páginas dependem de JavaScript são extraídos em seguida pelo navegador.
+    """
+    preparar_excel()
+    cliente_http.copiar_cookies(sei.driver)
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=cliente_http.conexoes, thread_name_prefix="http") as executor:
+        extraidos = list(executor.map(lambda process_number: processar_http(sei, process_number), processos))
+    duracao = time.perf_counter() - inicio
+    logging.info(f"HTTP: {sum(extraidos)} processos em {duracao:.1f}s com {cliente_http.conexoes} conexões "
+                 f"({cliente_http.requisicoes} requisições)")
+
+    pelo_navegador = [process_number for process_number, extraido in zip(processos, extraidos) if not extraido]
+    if pelo_navegador:
+        logging.info(f"{len(pelo_navegador)} processos dependem de JavaScript; extraindo pelo navegador")
+        sei.driver.get(sei_url)
+        for process_number in pelo_navegador:
+            processar(sei, process_number)
             time.sleep(1)
+        encerrar_prefetch(sei)
+
+    materializar_planilha()
+
+def executar_worker(worker_id, sei, fila):
+    """Consome a fila de processos com uma sessão própria do SEI até esvaziá-la."""
+    processados = 0
+    inicio = time.perf_counter()
+    try:
+        sei.driver.get(sei_url)
+        while True:
+            try:
+                process_number = fila.get_nowait()
+            except queue.Empty:
+                break
+            processar(sei, process_number)
+            processados += 1
+            time.sleep(1)
+    except Exception as e:
+        logging.error(f"Worker {worker_id} interrompido: {e}")
+    finally:
+        encerrar_prefetch(sei)
+
+    duracao = time.perf_counter() - inicio
+    por_minuto = processados / duracao * 60 if duracao > 0 else 0
+    logging.info(f"Worker {worker_id}: {processados} processos em {duracao:.1f}s ({por_minuto:.2f} processos/min)")
+
+def abrir_sessao_worker(worker_id, sei):
+    """Abre e autentica uma sessão adicional do SEI com as credenciais da sessão principal."""
+    try:
+        # Cada sessão precisa do próprio diretório de perfil: o Chrome bloqueia o diretório em uso
+        sessao = SeiLogin(chromedriver_path, chrome_options, root=sei.root, url=sei.url, interface=sei.root is not None,
+                          perfil=sei.perfil, diretorio_perfil=os.path.join(perfis_dir, f"{sei.perfil}_{worker_id}"))
+    except Exception as e:
+        logging.error(f"Worker {worker_id}: erro ao iniciar o navegador: {e}")
+        return None
+    # Com a sessão principal restaurada de cookies pode não haver credenciais; reaproveita os cookies
+    if sei.credenciais is None:
+        if sessao.restaurar_sessao():
+            return sessao
+        logging.error(f"Worker {worker_id}: sem credenciais para abrir uma nova sessão.")
+        sessao.encerrar()
+        return None
+    try:
+        sucesso = sessao.login(*sei.credenciais, notificar=False)
+    except Exception as e:
+        logging.error(f"Worker {worker_id}: erro no login: {e}")
+        sucesso = False
+    if not sucesso:
+        logging.error(f"Worker {worker_id}: falha no login, sessão descartada.")
+        sessao.encerrar()
+        return None
+    return sessao
+
+def encontrar_arquivos_paralelo(sei, processos, num_workers):
+    """Distribui os processos entre num_workers sessões do SEI logadas em paralelo.
+
+    A sessão principal é o worker 1; as demais são abertas com as mesmas credenciais.
+    Os processos são consumidos de uma fila compartilhada, de modo que um processo
+    lento ou com falha ocupa apenas o worker que o recebeu.
+    """
+    preparar_excel()
+
+    fila = queue.Queue()
+    for process_number in processos:
+        fila.put(process_number)
+
+    sessoes = [sei]
+    with ThreadPoolExecutor(max_workers=num_workers - 1 or 1) as executor:
+        futuros = [executor.submit(abrir_sessao_worker, worker_id, sei) for worker_id in range(2, num_workers + 1)]
+        sessoes += [futuro.result() for futuro in futuros]
+    logging.info(f"Pool iniciado com {sum(s is not None for s in sessoes)} de {num_workers} sessões.")
+
+    threads = []
+    for worker_id, sessao in enumerate(sessoes, start=1):
+        if sessao is None:
+            continue
+        thread = threading.Thread(target=executar_worker, args=(worker_id, sessao, fila), name=f"worker-{worker_id}")
+        thread.start()
+        threads.append(thread)
+
+    for thread in threads:
+        thread.join()
+
+    for sessao in sessoes[1:]:
+        if sessao is not None:
+            registrar_logins(sessao)
+            sessao.encerrar()
+
+    materializar_planilha()
             
+def registrar_inicializacao(etapa):
+    """Registra quanto tempo, desde o início do programa, a etapa da inicialização levou para ficar pronta."""
+    duracao = time.perf_counter() - inicio_programa
+    medidor.registrar(f"inicio_{etapa}", duracao)
+    logging.info(f"Inicialização: {etapa} pronto(a) em {duracao:.1f}s")
+
+def iniciar_navegador(sei):
+    sei.iniciar_navegador()
+    registrar_inicializacao("navegador")
+
+def preparar_entrada(args):
+    """Lê e valida a aba PROCESSO, abre o estado e, com --ocr, o pool de OCR.
+
+    Roda em segundo plano durante o login. Retorna os processos a visitar, ou None se a aba
+    não tiver processos válidos.
+    """
+    global process_numbers, estado, pendencias, pipeline_ocr
+    plano = planejar_entrada(ler_processos(excel_path))
+    registrar_plano(plano)
+    process_numbers = plano["validos"]
+    if not process_numbers:
+        logging.error("Nenhum processo válido na aba PROCESSO; nada a extrair.")
+        return None
+
+    estado = EstadoExtracao(estado_path)
+    pendencias = PendenciasAssincronas(estado)
+    if args.reiniciar:
+        estado.reiniciar()
+    estado.registrar_processos(process_numbers)
+    if modo_delta:
+        processos_a_visitar = list(process_numbers)
+    else:
+        processos_a_visitar = estado.processos_a_visitar(process_numbers, somente_falhas=args.somente_falhas)
+    logging.info(f"{len(processos_a_visitar)} de {len(process_numbers)} processos a visitar.")
+
+    if args.ocr:
+        from ocr_itens import PipelineOCR, ArquivoCapturas
+        from extratores import ExtratorOcr
+        arquivo_capturas = None
+        if args.salvar_capturas:
+            arquivo_capturas = ArquivoCapturas(os.path.join(atual_dir, 'screenshots'), args.formato_capturas,
+                                               args.escala_capturas, args.capturas_limite_mb * 1024 * 1024)
+        pipeline_ocr = PipelineOCR(journal, args.processos_ocr, arquivo_capturas)
+        extratores.append(ExtratorOcr(pipeline_ocr))
+    registrar_inicializacao("entrada")
+    return processos_a_visitar
+
 if __name__ == "__main__":
-    sei = SeiLogin(chromedriver_path, chrome_options)
+    # Necessário para o pool de OCR no executável gerado pelo PyInstaller (Windows)
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="Extração de itens dos Termos de processos do SEI")
+    parser.add_argument("--workers", type=int, default=1, help="Número de sessões do SEI em paralelo (padrão: 1)")
+    parser.add_argument("--perfil", choices=PERFIS, default=PERFIL_PADRAO,
+                        help="Perfil do navegador: 'padrao' (janela visível) ou 'rapido' (headless, sem imagens/CSS/fontes)")
+    parser.add_argument("--tentativas", type=int, default=3, help="Tentativas por passo em erros transitórios (padrão: 3)")
+    parser.add_argument("--orcamento-processo", type=int, default=5, help="Máximo de novas tentativas por processo (padrão: 5)")
+    parser.add_argument("--orcamento-execucao", type=int, default=200, help="Máximo de novas tentativas na execução (padrão: 200)")
+    parser.add_argument("--ocr", action="store_true",
+                        help="Usa OCR das capturas de tela nos Termos em que o texto do documento não tiver itens")
+    parser.add_argument("--processos-ocr", type=int, default=os.cpu_count(),
+                        help="Número de processos do pool de OCR (padrão: um por núcleo)")
+    parser.add_argument("--salvar-capturas", action="store_true",
+                        help="Com --ocr, guarda as capturas compactadas em screenshots/ (por padrão ficam só na memória)")
+    parser.add_argument("--formato-capturas", choices=("webp", "png", "jpeg"), default="webp",
+                        help="Formato das capturas guardadas (padrão: webp)")
+    parser.add_argument("--escala-capturas", type=float, default=0.5,
+                        help="Fator de redução das capturas guardadas (padrão: 0.5; 1 mantém o tamanho original)")
+    parser.add_argument("--capturas-limite-mb", type=int, default=200,
+                        help="Espaço máximo das capturas guardadas em MB; as mais antigas são apagadas (padrão: 200)")
+    parser.add_argument("--prazo-documento", type=int, default=120,
+                        help="Segundos para abrir e extrair um documento antes de reiniciar o navegador (padrão: 120; 0 desativa)")
+    parser.add_argument("--prazo-processo", type=int, default=900,
+                        help="Segundos para um processo inteiro antes de reiniciar o navegador (padrão: 900; 0 desativa)")
+    parser.add_argument("--verbose", action="store_true", help="Registra também as mensagens de diagnóstico (nível DEBUG)")
+    parser.add_argument("--materializar", action="store_true", help="Apenas grava na planilha os itens pendentes no journal e encerra")
+    parser.add_argument("--consolidar", action="store_true",
+                        help="Apenas grava em consolidado/ os itens extraídos normalizados e sem repetições (Parquet) e seus totais, e encerra")
+    parser.add_argument("--offline", action="store_true", help="Reconstrói os itens a partir do cache de documentos na aba Itens Reconstruídos, sem abrir o navegador")
+    parser.add_argument("--sem-cache", action="store_true", help="Não guarda o HTML dos Termos no cache de documentos")
+    parser.add_argument("--cache-limite-mb", type=int, default=500, help="Tamanho máximo do cache de documentos em MB (padrão: 500)")
+    parser.add_argument("--somente-falhas", action="store_true", help="Visita apenas os processos que falharam na execução anterior")
+    parser.add_argument("--abas", type=int, default=1,
+                        help=f"Abas por navegador para pré-carregar os próximos Termos enquanto o atual é extraído (padrão: 1, sem pré-carregamento; máximo: {ABAS_MAX})")
+    parser.add_argument("--delta", action="store_true",
+                        help="Revisita todos os processos, abrindo apenas os documentos que não estavam na árvore da execução anterior")
+    parser.add_argument("--http", action="store_true",
+                        help="Baixa árvore e documentos direto por HTTP com os cookies do navegador, que fica só para o login e as páginas que dependem de JavaScript")
+    parser.add_argument("--conexoes-http", type=int, default=CONEXOES_PADRAO,
+                        help=f"Com --http, conexões (e processos) simultâneos com o SEI (padrão: {CONEXOES_PADRAO})")
+    parser.add_argument("--reiniciar", action="store_true", help="Descarta o andamento salvo e extrai todos os processos novamente")
+    args = parser.parse_args()
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    if args.delta and args.somente_falhas:
+        parser.error("--delta não pode ser usado com --somente-falhas")
+    modo_delta = args.delta
+    prazo_documento_s = args.prazo_documento
+    if not 1 <= args.abas <= ABAS_MAX:
+        parser.error(f"--abas deve estar entre 1 e {ABAS_MAX}")
+    abas_prefetch = args.abas
+    if args.http:
+        if args.ocr or args.workers > 1 or args.abas > 1:
+            parser.error("--http não pode ser usado com --ocr, --workers ou --abas")
+        if args.conexoes_http < 1:
+            parser.error("--conexoes-http deve ser pelo menos 1")
+        cliente_http = ClienteSei(sei_url, args.conexoes_http)
+    prazo_processo_s = args.prazo_processo
+    politica = PoliticaRetentativa(tentativas_max=args.tentativas, orcamento_processo=args.orcamento_processo,
+                                   orcamento_execucao=args.orcamento_execucao)
+
+    if not args.sem_cache:
+        cache = CacheDocumentos(cache_dir, args.cache_limite_mb * 1024 * 1024)
+
+    if args.offline:
+        if cache is None:
+            parser.error("--offline não pode ser usado com --sem-cache")
+        reconstruir_do_cache()
+        raise SystemExit(0)
+
+    if args.materializar:
+        logging.info(f"{journal.materializar(excel_path)} itens gravados a partir do journal.")
+        raise SystemExit(0)
+
+    if args.consolidar:
+        if importlib.util.find_spec("pyarrow") is None:
+            parser.error("--consolidar requer o pyarrow (pip install pyarrow)")
+        from consolidacao_itens import gravar_consolidado
+        logging.info(f"{gravar_consolidado(excel_path, journal, consolidado_dir)} itens consolidados em {consolidado_dir}.")
+        raise SystemExit(0)
+
+    if args.ocr:
+        # Pillow, pytesseract e o Tesseract só são necessários com --ocr; o pool é criado em segundo
+        # plano (preparar_entrada), mas a falta dos pacotes é apontada já
+        faltando = [nome for nome in ("PIL", "pytesseract") if importlib.util.find_spec(nome) is None]
+        if faltando:
+            parser.error(f"--ocr requer Pillow e pytesseract: {', '.join(faltando)} não instalado")
+
+    # As janelas de log e de login abrem antes do navegador; o Chrome e a planilha de entrada são
+    # preparados em paralelo, em segundo plano, enquanto o usuário digita as credenciais
+    sei = SeiLogin(chromedriver_path, chrome_options, perfil=args.perfil, iniciar_navegador=False)
     prompt = PromptWindow(sei.root)
-    def executar_selenium():
-        prompt.prompt_window()
-        sei.login_window()
-        encontrar_arquivos()
-
-    selenium_thread = threading.Thread(target=executar_selenium)
-    selenium_thread.start()
-    sei.root.mainloop()
\ No newline at end of file
+    prompt.prompt_window()
+    sei.login_window()
+    sei.root.after(0, registrar_inicializacao, "interface")
+
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="inicializacao") as inicializacao:
+        futuro_navegador = inicializacao.submit(iniciar_navegador, sei)
+        futuro_entrada = inicializacao.submit(preparar_entrada, args)
+
+        def executar_selenium():
+            try:
+                futuro_navegador.result()
+                processos_a_visitar = futuro_entrada.result()
+            except Exception as e:
+                logging.error(f"Erro na inicialização: {e}")
+                processos_a_visitar = None
+            if processos_a_visitar is None:
+                if sei.driver is not None:
+                    sei.encerrar()
+                return
+            # Reaproveita a sessão salva ou as credenciais do cofre; a janela de login fecha sozinha
+            if not sei.restaurar_sessao():
+                credenciais = carregar_credenciais()
+                if credenciais is not None:
+                    try:
+                        sei.login(*credenciais, notificar=False)
+                    except Exception as e:
+                        # Sem o login automático, o usuário entra pela janela de login
+                        logging.error(f"Erro no login com as credenciais salvas: {e}")
+            sei.login_concluido.wait()
+            registrar_logins(sei)
+            if cliente_http is not None:
+                encontrar_arquivos_http(sei, processos_a_visitar)
+            elif args.workers > 1:
+                encontrar_arquivos_paralelo(sei, processos_a_visitar, args.workers)
+            else:
+                encontrar_arquivos(sei, processos_a_visitar)
+            logging.info(f"Andamento da extração: {estado.resumo()}")
+            logging.info(f"Retentativas: {politica.resumo()}")
+            logging.info(f"Navegador: {supervisor.resumo()}")
+            if abas_prefetch > 1:
+                logging.info(f"Pré-carregamento: {totais_prefetch.resumo()}")
+            from acesso_driver import latencias
+            for linha in latencias.resumo():
+                logging.info(linha)
+            medidor.registrar_resumo()
+
+        selenium_thread = threading.Thread(target=executar_selenium)
+        selenium_thread.start()
+        sei.root.mainloop()
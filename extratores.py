@@ -0,0 +1,137 @@
+import logging
+import threading
+
+from selenium.webdriver.common.by import By
+
+from estado_extracao import PENDENTE, CONCLUIDO, FALHA
+from parser_termo import extrair_conteudo
+
+# Retorno de um extrator cujo resultado chegará depois, fora da thread do navegador
+AGENDADO = "agendado"
+
+# Tabelas do Termo aberto na janela principal: dados do servidor e itens recebidos
+XPATH_TABELA_SERVIDOR = "/html/body/table[1]"
+XPATH_TABELA_ITENS = "/html/body/table[2]/tbody"
+
+
+class ExtratorDom:
+    """Lê o nome e as linhas da tabela do HTML do Termo, sem novas chamadas ao navegador."""
+
+    nome = "dom"
+    assincrono = False
+
+    def extrair(self, sei, process_number, documento, html, ao_concluir, nome_funcionario=""):
+        return extrair_conteudo(html)
+
+
+def capturar_tabelas(driver, aba=None):
+    """Capturas PNG (bytes) das tabelas do servidor e dos itens do Termo aberto; None para a tabela ausente.
+
+    aba=(handle, handle da aba principal) indica um Termo pré-carregado em outra aba, onde o
+    conteúdo está no iframe ifrArvoreHtml; ao final a aba principal volta a ser a atual.
+    """
+    if aba is not None:
+        driver.switch_to.window(aba[0])
+        if driver.find_elements(By.ID, "ifrArvoreHtml"):
+            driver.switch_to.frame("ifrArvoreHtml")
+    try:
+        capturas = []
+        for xpath in (XPATH_TABELA_SERVIDOR, XPATH_TABELA_ITENS):
+            elementos = driver.find_elements(By.XPATH, xpath)
+            capturas.append(elementos[0].screenshot_as_png if elementos else None)
+        return capturas
+    finally:
+        if aba is not None:
+            driver.switch_to.window(aba[1])
+
+
+class ExtratorOcr:
+    """Captura as tabelas do Termo aberto e agenda o OCR no PipelineOCR.
+
+    A thread do navegador só tira as capturas; o pool grava os itens no journal e chama
+    ao_concluir(itens, erro) quando o OCR do documento termina. O nome do funcionário já lido do
+    HTML (nome_funcionario) vale para os itens do OCR no lugar do nome lido da captura.
+    """
+
+    nome = "ocr"
+    assincrono = True
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+
+    def extrair(self, sei, process_number, documento, html, ao_concluir, nome_funcionario=""):
+        png_servidor, png_itens = capturar_tabelas(sei.driver, documento.get("aba"))
+        if png_itens is None:
+            return {"nome": "", "linhas": []}
+        self.pipeline.enviar(process_number, documento["titulo"], png_servidor, png_itens, ao_concluir,
+                             nome_funcionario=nome_funcionario)
+        return AGENDADO
+
+
+class PendenciasAssincronas:
+    """Status dos processos com documentos entregues a um extrator assíncrono (OCR).
+
+    O resultado do OCR pode chegar antes ou depois de o processo terminar na thread do navegador.
+    Enquanto houver documentos pendentes o processo fica PENDENTE no estado (e é revisitado se a
+    execução for interrompida); o último documento a concluir define CONCLUIDO ou FALHA.
+    """
+
+    def __init__(self, estado):
+        self.estado = estado
+        self._lock = threading.Lock()
+        self._processos = {}
+
+    def _registro(self, process_number):
+        return self._processos.setdefault(process_number, {"pendentes": 0, "erro": None, "falhou": False, "finalizado": False})
+
+    def agendar(self, process_number):
+        with self._lock:
+            self._registro(process_number)["pendentes"] += 1
+
+    def cancelar(self, process_number):
+        """Desfaz agendar() quando o extrator não chegou a agendar o documento."""
+        self.concluir_documento(process_number, None, None, None)
+
+    def concluir_documento(self, process_number, documento, documento_titulo, erro):
+        with self._lock:
+            registro = self._registro(process_number)
+            registro["pendentes"] -= 1
+            if documento is not None:
+                self.estado.marcar_documentos(process_number, [(documento, documento_titulo, FALHA if erro else CONCLUIDO, erro)])
+            if erro is not None:
+                registro["erro"] = registro["erro"] or erro
+                registro["falhou"] = True
+            if registro["finalizado"] and registro["pendentes"] == 0:
+                status = FALHA if registro["falhou"] else CONCLUIDO
+                self.estado.marcar_processo(process_number, status, registro["erro"])
+                logging.log(logging.ERROR if status == FALHA else logging.INFO,
+                            f"Processo {process_number}: {status} após o OCR",
+                            extra={"processo": process_number, "status": status, "erro": registro["erro"]})
+            self._limpar(process_number, registro)
+
+    def finalizar_processo(self, process_number, documentos, erro):
+        """Grava os documentos já resolvidos e o status do processo; retorna o status gravado.
+
+        documentos: tuplas (documento, titulo, status, erro) dos documentos tratados na thread
+        do navegador; os PENDENTE são gravados por concluir_documento().
+        """
+        with self._lock:
+            registro = self._registro(process_number)
+            self.estado.marcar_documentos(process_number, [documento for documento in documentos if documento[2] != PENDENTE])
+            registro["erro"] = erro = erro or registro["erro"]
+            if erro is not None or any(status == FALHA for _, _, status, _ in documentos):
+                registro["falhou"] = True
+            if registro["falhou"]:
+                status = FALHA
+            elif registro["pendentes"]:
+                status = PENDENTE
+            else:
+                status = CONCLUIDO
+            self.estado.marcar_processo(process_number, status, erro)
+            registro["finalizado"] = True
+            self._limpar(process_number, registro)
+            return status
+
+    def _limpar(self, process_number, registro):
+        if registro["finalizado"] and registro["pendentes"] == 0:
+            del self._processos[process_number]
@@ -0,0 +1,94 @@
+import csv
+import logging
+import os
+import threading
+import time
+
+# O pandas só é importado ao ler ou gravar a planilha, para não atrasar a abertura do programa
+
+
+def gravar_aba(excel_path, df, sheet_name):
+    """Grava df na aba sheet_name, substituindo-a e preservando as demais abas da planilha."""
+    import pandas as pd
+
+    if os.path.exists(excel_path):
+        with pd.ExcelWriter(excel_path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
+            df.to_excel(writer, index=False, sheet_name=sheet_name)
+    else:
+        df.to_excel(excel_path, index=False, sheet_name=sheet_name)
+
+
+class JournalItens:
+    """Journal append-only (CSV) dos itens extraídos.
+
+    Cada processo concluído é acrescentado ao final do arquivo com flush + fsync, o que
+    custa o mesmo independentemente do tamanho da planilha. A aba 'Itens Extraídos' só é
+    reescrita em materializar(), uma vez ao final da execução ou sob demanda; enquanto isso
+    não acontece, o journal é a cópia durável dos itens.
+    """
+
+    def __init__(self, journal_path, colunas):
+        self.journal_path = journal_path
+        self.colunas = colunas
+        self._lock = threading.Lock()
+
+    def adicionar(self, itens):
+        if not itens:
+            return
+        with self._lock:
+            novo = not os.path.exists(self.journal_path)
+            with open(self.journal_path, "a", newline="", encoding="utf-8") as arquivo:
+                writer = csv.DictWriter(arquivo, fieldnames=self.colunas)
+                if novo:
+                    writer.writeheader()
+                writer.writerows(itens)
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+
+    def ler(self):
+        import pandas as pd
+
+        if not os.path.exists(self.journal_path):
+            return pd.DataFrame(columns=self.colunas)
+        return pd.read_csv(self.journal_path, dtype=str, keep_default_na=False, encoding="utf-8")
+
+    def pendente(self):
+        return os.path.exists(self.journal_path) and os.path.getsize(self.journal_path) > 0
+
+    def materializar(self, excel_path, sheet_name="Itens Extraídos"):
+        """Acrescenta os itens do journal à aba sheet_name e esvazia o journal.
+
+        As demais abas da planilha (ex.: PROCESSO) são preservadas. Em caso de falha o journal
+        é mantido para a próxima execução e uma cópia é gravada em backup_itens_<timestamp>.xlsx.
+        Retorna o número de linhas gravadas na planilha.
+        """
+        import pandas as pd
+
+        with self._lock:
+            df_novos = self.ler()
+            if df_novos.empty:
+                return 0
+            try:
+                if os.path.exists(excel_path):
+                    try:
+                        df_existente = pd.read_excel(excel_path, sheet_name=sheet_name)
+                    except ValueError:
+                        df_existente = pd.DataFrame(columns=self.colunas)
+                    df_final = pd.concat([df_existente, df_novos], ignore_index=True)
+                else:
+                    df_final = df_novos
+                gravar_aba(excel_path, df_final, sheet_name)
+
+                os.remove(self.journal_path)
+                logging.info(f"Planilha atualizada com {len(df_novos)} itens do journal: {excel_path}")
+                return len(df_novos)
+
+            except Exception as e:
+                backup_path = os.path.join(os.path.dirname(excel_path), f"backup_itens_{int(time.time())}.xlsx")
+                try:
+                    df_novos.to_excel(backup_path, index=False)
+                    logging.error(f"Erro ao gravar os itens na planilha ({e}). Backup salvo em: {backup_path}")
+                except Exception as e_backup:
+                    logging.error(f"Erro ao gravar os itens na planilha ({e}) e no backup ({e_backup}).")
+                logging.error(f"Os itens continuam no journal {self.journal_path} e serão gravados na próxima execução.")
+                return 0
@@ -1,26 +1,91 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import (UnexpectedAlertPresentException, NoAlertPresentException)
 from selenium.webdriver.common.by import By
 import tkinter as tk
 from tkinter import scrolledtext
 from tkinter import messagebox
 import threading
+import queue
 import os
 import sys
 import time
+import copy
+import subprocess
+import tempfile
+import json
 import logging
 
+# WebDriverWait, expected_conditions, o Service e o próprio webdriver.Chrome (acesso_driver) carregam
+# o cliente WebDriver inteiro; são importados só ao usar o navegador, para a interface abrir antes
+
+# Cofre de senhas do sistema (Gerenciador de Credenciais do Windows); opcional
+try:
+    import keyring
+except ImportError:
+    keyring = None
+
+# Usado para encerrar o Chrome junto com um chromedriver travado; opcional
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+SEI_URL = "https://sei.antt.gov.br/"
+
+# Perfis de navegador: o padrão renderiza a página completa (necessário para screenshots/OCR);
+# o rápido roda sem janela, sem imagens/CSS/fontes e com cache em disco reaproveitado.
+PERFIL_PADRAO = "padrao"
+PERFIL_RAPIDO = "rapido"
+PERFIS = (PERFIL_PADRAO, PERFIL_RAPIDO)
+
+# Recursos bloqueados no perfil rápido (Network.setBlockedURLs)
+URLS_BLOQUEADAS_PERFIL_RAPIDO = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico", "*.webp",
+    "*.css",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*google-analytics.com*", "*googletagmanager.com*", "*hotjar*", "*matomo*", "*piwik*",
+]
+
+perfis_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perfil_chrome")
+
+# Cookies da última sessão autenticada, para pular o login ao reabrir o programa
+sessao_path = os.path.join(perfis_dir, "sessao_sei.json")
+
+SERVICO_KEYRING = "extracao_itens-sei"
+CHAVE_USUARIO_KEYRING = "__usuario__"
+
+def carregar_credenciais():
+    """Retorna (usuário, senha) guardados no cofre do sistema, ou None."""
+    if keyring is None:
+        return None
+    try:
+        user = keyring.get_password(SERVICO_KEYRING, CHAVE_USUARIO_KEYRING)
+        password = keyring.get_password(SERVICO_KEYRING, user) if user else None
+    except Exception as e:
+        logging.error(f"Erro ao ler as credenciais do cofre do sistema: {e}")
+        return None
+    return (user, password) if user and password else None
+
+def salvar_credenciais(user, password):
+    if keyring is None:
+        return False
+    try:
+        keyring.set_password(SERVICO_KEYRING, CHAVE_USUARIO_KEYRING, user)
+        keyring.set_password(SERVICO_KEYRING, user, password)
+        return True
+    except Exception as e:
+        logging.error(f"Erro ao guardar as credenciais no cofre do sistema: {e}")
+        return False
+
 class SeiLogin:
-    def __init__(self, chromedriver_path, chrome_options=None):
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
-        if not os.path.isfile(chromedriver_path):
+    def __init__(self, chromedriver_path, chrome_options=None, root=None, url=SEI_URL, interface=True,
+                 perfil=PERFIL_PADRAO, diretorio_perfil=None, arquivo_sessao=sessao_path, iniciar_navegador=True):
+        """iniciar_navegador=False cria só a interface; o Chrome é aberto depois por iniciar_navegador()."""
+        self.url = url
+        self.arquivo_sessao = arquivo_sessao
+        self._relogin_lock = threading.Lock()
+        # chromedriver_path=None usa o chromedriver localizado pelo Selenium Manager (ex.: benchmarks no Linux)
+        if chromedriver_path is not None and not os.path.isfile(chromedriver_path):
             logging.error(f"Chromedriver não encontrado: {chromedriver_path}")
             raise FileNotFoundError("Chromedriver não encontrado.")
         
@@ -33,24 +98,118 @@ class SeiLogin:
             "download.directory_upgrade": True,
             "safebrowsing.enabled": True
         }
-        chrome_options = Options()
+        # Copia as opções recebidas, que podem ser compartilhadas entre as sessões do pool
+        chrome_options = copy.deepcopy(chrome_options) if chrome_options is not None else Options()
         chrome_options.add_experimental_option("prefs", prefs)
         chrome_options.add_argument("--maximized")  # Modo headless maximized    
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--window-size=1920,1080")  # Define a resolução da janela
 
-        # Inicializa o ChromeDriver com logs detalhados
-        service = Service(chromedriver_path)
-        service.log_path = "chromedriver.log"
-        service.log_level = "DEBUG"
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        if perfil == PERFIL_RAPIDO:
+            # Só o DOM interessa: sem janela, sem esperar imagens/subrecursos e com o cache
+            # em disco de um diretório de perfil reaproveitado entre execuções
+            prefs["profile.managed_default_content_settings.images"] = 2
+            chrome_options.add_argument("--headless=new")
+            chrome_options.page_load_strategy = "eager"
+            chrome_options.add_argument(f"--user-data-dir={diretorio_perfil or os.path.join(perfis_dir, PERFIL_RAPIDO)}")
+            chrome_options.add_argument("--disable-extensions")
+            chrome_options.add_argument("--log-level=3")
+        self.perfil = perfil
+        self._chromedriver_path = chromedriver_path
+        self._chrome_options = chrome_options
+
+        # Sessões adicionais (pool de workers) compartilham a janela raiz da sessão principal;
+        # interface=False dispensa o Tk (execução sem tela, ex.: benchmarks)
+        if root is None and interface:
+            root = tk.Tk()
+            root.withdraw()
+        self.root = root
 
-        self.driver.get("https://sei.antt.gov.br/")
-        self.root = tk.Tk()
-        self.root.withdraw()
+        # Credenciais da última autenticação bem-sucedida, reaproveitadas pelas sessões do pool
+        self.credenciais = None
+        self.login_concluido = threading.Event()
+        # (duração em segundos, sucesso) de cada chamada a login(), para o relatório de tempos
+        self.tempos_login = []
+
+        self.driver = None
+        self.navegador_pronto = threading.Event()
+        if iniciar_navegador:
+            self.iniciar_navegador()
+
+    def iniciar_navegador(self):
+        """Abre o Chrome na página do SEI; quem precisar do navegador espera navegador_pronto.
+
+        navegador_pronto é sinalizado mesmo se o Chrome não abrir; nesse caso driver fica None.
+        """
+        try:
+            self.driver = self._iniciar_driver()
+            self.driver.get(self.url)
+        finally:
+            self.navegador_pronto.set()
+
+    def _iniciar_driver(self):
+        from selenium.webdriver.chrome.service import Service
+        from acesso_driver import ChromeSerializado
+
+        if self.perfil == PERFIL_RAPIDO:
+            service = Service(self._chromedriver_path, log_output=subprocess.DEVNULL)
+        else:
+            # Inicializa o ChromeDriver com logs detalhados
+            service = Service(self._chromedriver_path) if self._chromedriver_path is not None else Service()
+            service.log_path = "chromedriver.log"
+            service.log_level = "DEBUG"
+        # Comandos serializados entre as threads (login, extração, interface) e pool de conexões ajustado
+        driver = ChromeSerializado(service=service, options=self._chrome_options)
+        if self.perfil == PERFIL_RAPIDO:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": URLS_BLOQUEADAS_PERFIL_RAPIDO})
+        return driver
+
+    def matar_navegador(self):
+        """Encerra à força o chromedriver e o Chrome desta sessão, sem passar pelo WebDriver.
+
+        Usado quando uma chamada ao navegador travou: a chamada pendente falha na hora com
+        erro de conexão e libera a thread que a fez.
+        """
+        processo = getattr(self.driver.service, "process", None)
+        if processo is None:
+            return
+        try:
+            if psutil is not None:
+                for filho in psutil.Process(processo.pid).children(recursive=True):
+                    filho.kill()
+            elif os.name == "nt":
+                subprocess.run(["taskkill", "/T", "/F", "/PID", str(processo.pid)], capture_output=True)
+            processo.kill()
+        except Exception as e:
+            logging.error(f"Erro ao encerrar o navegador travado: {e}")
+
+    def reiniciar_navegador(self):
+        """Substitui o navegador desta sessão por um novo e autentica de novo no SEI.
+
+        Tenta primeiro os cookies salvos e depois as credenciais da última autenticação.
+        Retorna True se a nova sessão estiver pronta para uso.
+        """
+        self.matar_navegador()
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        try:
+            self.driver = self._iniciar_driver()
+            self.driver.get(self.url)
+        except Exception as e:
+            logging.error(f"Erro ao abrir um novo navegador: {e}")
+            return False
+        if self.restaurar_sessao():
+            return True
+        return self.relogar()
 
     def wait_for_element(self, element, timer):
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
         return WebDriverWait(self.driver, timer).until(
             EC.presence_of_element_located((By.XPATH, element))
         )
@@ -77,7 +236,23 @@ class SeiLogin:
             logging.error(f"Erro durante a execução de login_action: {e}")
             return False
     
-    def login(self, user, password):
+    def login(self, user, password, notificar=True):
+        inicio = time.perf_counter()
+        sucesso = False
+        try:
+            # Os comandos do login não podem ser intercalados com os de outra thread
+            with self.driver.lock:
+                sucesso = self._login(user, password, notificar)
+            return sucesso
+        finally:
+            duracao = time.perf_counter() - inicio
+            self.tempos_login.append((duracao, bool(sucesso)))
+            logging.info(f"Tentativa de login concluída em {duracao:.1f}s")
+
+    def _login(self, user, password, notificar):
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
         logging.info('Acessando o SEI')
         current_url = self.driver.current_url
         self.login_action(user, password)
@@ -97,20 +272,24 @@ class SeiLogin:
                 # Verifica se o login foi bem-sucedido
                 if self.driver.find_element(By.XPATH, '//*[@id="divInfraAreaTela"]').is_displayed():
                     logging.info("Login efetuado com sucesso!")
-                    self.root.after(0, lambda: messagebox.showinfo("Sucesso", "Login efetuado com sucesso!"))
+                    self._login_sucesso(user, password)
+                    if notificar and self.root is not None:
+                        self.root.after(0, lambda: messagebox.showinfo("Sucesso", "Login efetuado com sucesso!"))
                     return True
 
             except Exception as e:    
                 # Verifica se ocorreu um erro fatal
                 if "Fatal error" in self.driver.page_source:
                     logging.error("Erro fatal detectado durante o login. Recarregando a página...")
-                    self.driver.get("https://sei.antt.gov.br/")
+                    self.driver.get(self.url)
                     self.driver.refresh()
                     WebDriverWait(self.driver, 240).until(
                         EC.presence_of_element_located((By.XPATH, '//*[@id="divInfraAreaTela"]'))
                     )
                     logging.info("Página recarregada com sucesso. Login efetuado!")
-                    self.root.after(0, lambda: messagebox.showinfo("Sucesso", "Login efetuado com sucesso após recarregar a página!"))
+                    self._login_sucesso(user, password)
+                    if notificar and self.root is not None:
+                        self.root.after(0, lambda: messagebox.showinfo("Sucesso", "Login efetuado com sucesso após recarregar a página!"))
                     return True
 
         except UnexpectedAlertPresentException:
@@ -124,15 +303,110 @@ class SeiLogin:
             except NoAlertPresentException:
                 user_fild = self.driver.find_element(By.CSS_SELECTOR, '*[id*="txtUsuario"]')
                 self.driver.execute_script("arguments[0].value = '';", user_fild)
-                self.root.after(0, lambda: messagebox.showerror("Login incorreto", f"Verifique o login e a senha."))
+                if self.root is not None:
+                    self.root.after(0, lambda: messagebox.showerror("Login incorreto", f"Verifique o login e a senha."))
                 logging.error("Login ou senha incorretos.")
                 return False         
-               
+
+    def _login_sucesso(self, user, password):
+        self.credenciais = (user, password)
+        self.salvar_sessao()
+        self.login_concluido.set()
+
+    def salvar_sessao(self):
+        """Grava os cookies da sessão autenticada em arquivo_sessao."""
+        if not self.arquivo_sessao:
+            return
+        temporario = None
+        try:
+            diretorio = os.path.dirname(self.arquivo_sessao)
+            os.makedirs(diretorio, exist_ok=True)
+            # Temporário próprio desta gravação: as sessões dos workers gravam o mesmo arquivo_sessao
+            # ao mesmo tempo, e um nome fixo faria uma apagar ou corromper o temporário da outra
+            descritor, temporario = tempfile.mkstemp(prefix=f"{os.path.basename(self.arquivo_sessao)}.", suffix=".tmp", dir=diretorio)
+            with open(descritor, "w", encoding="utf-8") as arquivo:
+                json.dump({"url": self.url, "cookies": self.driver.get_cookies()}, arquivo)
+            os.replace(temporario, self.arquivo_sessao)
+        except Exception as e:
+            logging.error(f"Erro ao salvar os cookies da sessão: {e}")
+            if temporario is not None and os.path.exists(temporario):
+                os.remove(temporario)
+
+    def restaurar_sessao(self):
+        """Reaplica os cookies salvos e verifica se a sessão no SEI ainda é válida.
+
+        Em caso de sucesso a sessão fica pronta sem passar pelo login; as credenciais do
+        cofre do sistema, se houver, ficam disponíveis para um novo login automático.
+        """
+        if not self.arquivo_sessao or not os.path.isfile(self.arquivo_sessao):
+            return False
+        try:
+            with open(self.arquivo_sessao, encoding="utf-8") as arquivo:
+                salvo = json.load(arquivo)
+            if salvo.get("url") != self.url:
+                return False
+            agora = time.time()
+            with self.driver.lock:
+                for cookie in salvo.get("cookies", []):
+                    if cookie.get("expiry") and cookie["expiry"] < agora:
+                        continue
+                    cookie.pop("sameSite", None)
+                    self.driver.add_cookie(cookie)
+                self.driver.get(self.url)
+                if self.sessao_expirada() or not self.driver.find_elements(By.ID, "divInfraAreaTela"):
+                    logging.info("Sessão salva expirada; é necessário fazer login.")
+                    return False
+        except Exception as e:
+            logging.error(f"Erro ao restaurar a sessão salva: {e}")
+            return False
+
+        logging.info("Sessão anterior restaurada; login dispensado.")
+        self.credenciais = self.credenciais or carregar_credenciais()
+        self.login_concluido.set()
+        return True
+
+    def sessao_expirada(self):
+        """Indica se o SEI redirecionou para o formulário de login."""
+        try:
+            return ("login.php" in self.driver.current_url
+                    or bool(self.driver.find_elements(By.CSS_SELECTOR, '*[id*="txtUsuario"]')))
+        except Exception:
+            return False
+
+    def relogar(self):
+        """Refaz o login sem interação, com as credenciais da última autenticação ou do cofre."""
+        with self._relogin_lock:
+            credenciais = self.credenciais or carregar_credenciais()
+            if credenciais is None:
+                logging.error("Sessão do SEI expirada e não há credenciais disponíveis para um novo login.")
+                return False
+            logging.warning("Sessão do SEI expirada; refazendo o login.")
+            with self.driver.lock:
+                try:
+                    self.driver.get(self.url)
+                    if not self.sessao_expirada():
+                        return True
+                except Exception as e:
+                    logging.error(f"Erro ao abrir a página de login: {e}")
+                    return False
+                try:
+                    return self.login(*credenciais, notificar=False)
+                except Exception as e:
+                    # Ex.: tempo esgotado aguardando a tela principal; quem chamou trata como relogin falho
+                    logging.error(f"Erro ao refazer o login: {e}")
+                    return False
+
+    def encerrar(self):
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logging.error(f"Erro ao encerrar o navegador: {e}")
+
     def login_window(self):
         # Criação da interface gráfica para entrada de login e senha
         login_window = tk.Toplevel(self.root)
         login_window.title("Login SEI")
-        login_window.geometry("250x125")
+        login_window.geometry("250x150")
         login_window.resizable(False, False)
 
         # Labels e campos de entrada de Usuario
@@ -146,6 +420,12 @@ class SeiLogin:
         password_entry.grid(row=1, column=1, padx=5, pady=10)
         password_entry.bind("<Return>", lambda event: login_submit())
 
+        # Guarda usuário e senha no cofre do sistema para logins automáticos
+        lembrar = tk.BooleanVar(value=False)
+        if keyring is not None:
+            tk.Checkbutton(login_window, text="Lembrar senha neste computador", variable=lembrar,
+                           font=("Arial", 9)).grid(row=2, column=0, columnspan=2)
+
         # Variável para armazenar o frame de sobreposição
         overlay_frame = None
         spinner_canvas = None
@@ -189,13 +469,36 @@ class SeiLogin:
                 messagebox.showwarning("Aviso", "Por favor, preencha todos os campos")
 
         def process_login(user, password):
-            if self.login(user, password):
-                login_window.destroy()
+            # A janela abre antes do navegador: o login espera o Chrome terminar de abrir
+            self.navegador_pronto.wait()
+            if self.driver is None:
+                logging.error("O navegador não foi aberto; não é possível fazer o login.")
+                hide_spinner()
+                return
+            with self.driver.lock:
+                # A sessão pode ter sido restaurada em segundo plano enquanto o usuário digitava
+                if self.login_concluido.is_set():
+                    return
+                sucesso = self.login(user, password)
+            if sucesso:
+                if lembrar.get():
+                    salvar_credenciais(user, password)
             else:
                 login_entry.delete(0, tk.END)
                 password_entry.delete(0, tk.END)
             hide_spinner()
 
+        def fechar_apos_login():
+            # Fecha na thread do Tk, venha o login da janela, do cofre ou da sessão restaurada
+            if not login_window.winfo_exists():
+                return
+            if self.login_concluido.is_set():
+                login_window.destroy()
+            else:
+                login_window.after(200, fechar_apos_login)
+
+        fechar_apos_login()
+
         # Botão de envio
         submit_button = tk.Button(
             login_window,
@@ -204,7 +507,7 @@ class SeiLogin:
             bg="#90EE90",
             fg="#006400",
             command=login_submit)
-        submit_button.grid(row=2, column=1, pady=10)
+        submit_button.grid(row=3, column=1, pady=10)
 
         # Botão para fechar a janela
         close_button = tk.Button(
@@ -215,13 +518,38 @@ class SeiLogin:
             bg="#800000",
             fg="#FFC0CB"
             )
-        close_button.grid(row=2, column=0, columnspan=1, pady=10)
+        close_button.grid(row=3, column=0, columnspan=1, pady=10)
+
+class FilaLogHandler(logging.Handler):
+    """Handler que apenas enfileira a mensagem formatada; quem exibe é o loop do Tk.
+
+    Nunca bloqueia a thread que registra o log: com a fila cheia (interface travada ou
+    muito atrasada) a mensagem é descartada e contabilizada.
+    """
+    def __init__(self, fila):
+        super().__init__()
+        self.fila = fila
+        self.descartadas = 0
+
+    def emit(self, record):
+        try:
+            self.fila.put_nowait(self.format(record))
+        except queue.Full:
+            self.descartadas += 1
+        except Exception:
+            self.handleError(record)
 
 class PromptWindow:
-    def __init__(self, root):
+    def __init__(self, root, max_linhas=5000, intervalo_ms=100, lote_max=500, tamanho_fila=10000):
         self.root = root
+        # Limite de linhas mantidas no widget (scrollback) e ritmo/tamanho dos lotes exibidos
+        self.max_linhas = max_linhas
+        self.intervalo_ms = intervalo_ms
+        self.lote_max = lote_max
+        self.fila_log = queue.Queue(maxsize=tamanho_fila)
     
     def prompt_window(self):
+        """Cria a janela de log. Deve ser chamada na thread do Tk (a mesma do mainloop)."""
         prompt_window = tk.Toplevel(self.root)
         prompt_window.title("Log de Execução")
 
@@ -238,19 +566,34 @@ class PromptWindow:
         )
         output_text.grid(row=0, column=0, padx=10, pady=10)
 
-        class TextHandler(logging.Handler):
-            def __init__(self, text_widget):
-                super().__init__()
-                self.text_widget = text_widget
-            def emit(self, record):
-                log_entry = self.format(record)
-                self.text_widget.insert(tk.END, log_entry + "\n")
-                self.text_widget.see(tk.END)
-        
-        text_handler = TextHandler(output_text)
+        text_handler = FilaLogHandler(self.fila_log)
         text_handler.setFormatter(logging.Formatter("%(message)s"))
         logging.getLogger().addHandler(text_handler)
 
+        def drenar_log():
+            if not output_text.winfo_exists():
+                logging.getLogger().removeHandler(text_handler)
+                return
+            linhas = []
+            try:
+                while len(linhas) < self.lote_max:
+                    linhas.append(self.fila_log.get_nowait())
+            except queue.Empty:
+                pass
+            if text_handler.descartadas:
+                linhas.append(f"[{text_handler.descartadas} mensagens de log omitidas na janela; veja o arquivo de log]")
+                text_handler.descartadas = 0
+            if linhas:
+                output_text.insert(tk.END, "\n".join(linhas) + "\n")
+                excesso = int(output_text.index("end-1c").split(".")[0]) - 1 - self.max_linhas
+                if excesso > 0:
+                    output_text.delete("1.0", f"{excesso + 1}.0")
+                output_text.see(tk.END)
+            # Com mensagens acumuladas, volta logo; senão espera o próximo ciclo
+            self.root.after(10 if not self.fila_log.empty() else self.intervalo_ms, drenar_log)
+
+        drenar_log()
+
         # Botão para fechar a janela
         close_button = tk.Button(
             prompt_window,
@@ -265,6 +608,7 @@ class PromptWindow:
 if __name__ == "__main__":
     # O caminho do arquivo que você quer enviar
     atual_dir = os.path.dirname(os.path.abspath(__file__))
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     chromedriver_path = os.path.join(atual_dir, "chromedriver-win64", "chromedriver.exe")
     
     sei = SeiLogin(chromedriver_path)
@@ -0,0 +1,116 @@
+import gzip
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+# Campos anexados a cada registro a partir do contexto da thread que o emitiu
+CAMPOS_CONTEXTO = ("processo", "documento", "etapa")
+# Campos que podem vir em extra={...} de uma chamada de log (ex.: o status final de um processo)
+CAMPOS_EXTRAS = ("status", "erro")
+
+TAMANHO_MAX_PADRAO = 5 * 1024 * 1024
+ARQUIVOS_ANTIGOS_PADRAO = 50
+
+_contexto = threading.local()
+
+
+def campos_contexto():
+    return dict(getattr(_contexto, "campos", {}))
+
+
+def definir_contexto(**campos):
+    """Atualiza o contexto da thread atual; None apaga o campo."""
+    atuais = campos_contexto()
+    for nome, valor in campos.items():
+        if valor is None:
+            atuais.pop(nome, None)
+        else:
+            atuais[nome] = valor
+    _contexto.campos = atuais
+
+
+@contextmanager
+def contexto_log(**campos):
+    """Anexa os campos aos registros emitidos pela thread dentro do bloco e restaura os anteriores ao sair."""
+    anteriores = campos_contexto()
+    definir_contexto(**campos)
+    try:
+        yield
+    finally:
+        _contexto.campos = anteriores
+
+
+class FiltroContexto(logging.Filter):
+    """Copia o contexto da thread para o registro, sem sobrescrever o que veio em extra."""
+
+    def filter(self, record):
+        for nome, valor in campos_contexto().items():
+            if not hasattr(record, nome):
+                setattr(record, nome, valor)
+        return True
+
+
+class FormatadorJson(logging.Formatter):
+    """Um objeto JSON por linha: data, nível, thread, mensagem e os campos de contexto presentes."""
+
+    # json.dumps com argumentos cria um encoder novo a cada chamada
+    _codificador = json.JSONEncoder(ensure_ascii=False)
+
+    def format(self, record):
+        registro = {
+            "ts": f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created))}.{int(record.msecs):03d}",
+            "nivel": record.levelname,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        for nome in CAMPOS_CONTEXTO + CAMPOS_EXTRAS:
+            valor = getattr(record, nome, None)
+            if valor is not None:
+                registro[nome] = valor
+        if record.exc_info:
+            registro["excecao"] = self.formatException(record.exc_info)
+        return self._codificador.encode(registro)
+
+
+class ArquivoRotativoCompactado(RotatingFileHandler):
+    """RotatingFileHandler que compacta com gzip cada arquivo rotacionado (arquivo.1.gz, arquivo.2.gz...)."""
+
+    def __init__(self, filename, max_bytes=TAMANHO_MAX_PADRAO, backup_count=ARQUIVOS_ANTIGOS_PADRAO):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self.namer = lambda nome: f"{nome}.gz"
+        self.rotator = self._compactar
+
+    def shouldRollover(self, record):
+        # O RotatingFileHandler formata cada registro de novo só para medir o tamanho e consulta o
+        # disco a cada registro; basta a posição no arquivo (ele passa do limite em no máximo uma linha)
+        if self.stream is None:
+            self.stream = self._open()
+        return self.maxBytes > 0 and self.stream.tell() >= self.maxBytes
+
+    @staticmethod
+    def _compactar(origem, destino):
+        with open(origem, "rb") as entrada, gzip.open(destino, "wb") as saida:
+            shutil.copyfileobj(entrada, saida)
+        os.remove(origem)
+
+
+def configurar_logs(arquivo, nivel=logging.INFO, max_bytes=TAMANHO_MAX_PADRAO, backup_count=ARQUIVOS_ANTIGOS_PADRAO):
+    """Grava o log da aplicação em JSON Lines, com rotação por tamanho e compactação.
+
+    Como logging.basicConfig, não faz nada se o logger raiz já tiver handlers (ex.: os
+    benchmarks configuram o próprio log antes de importar o script).
+    """
+    raiz = logging.getLogger()
+    if raiz.handlers:
+        return
+    os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+    handler = ArquivoRotativoCompactado(arquivo, max_bytes, backup_count)
+    handler.addFilter(FiltroContexto())
+    handler.setFormatter(FormatadorJson())
+    raiz.addHandler(handler)
+    raiz.setLevel(nivel)
@@ -0,0 +1,109 @@
+import json
+import math
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from logs_estruturados import contexto_log
+
+
+def percentil(valores, p):
+    """Percentil p (0-100) pelo método nearest-rank; valores deve estar ordenado."""
+    if not valores:
+        return 0.0
+    indice = max(0, math.ceil(p / 100 * len(valores)) - 1)
+    return valores[indice]
+
+
+class TemposProcesso:
+    """Acumula a duração de cada etapa da extração de um processo."""
+
+    def __init__(self, processo):
+        self.processo = processo
+        self.inicio = time.time()
+        self._inicio_relogio = time.perf_counter()
+        self.etapas = defaultdict(float)
+        self.ocorrencias = defaultdict(list)
+
+    @contextmanager
+    def etapa(self, nome):
+        inicio = time.perf_counter()
+        try:
+            # A etapa também vai para os registros de log emitidos dentro dela
+            with contexto_log(etapa=nome):
+                yield
+        finally:
+            duracao = time.perf_counter() - inicio
+            self.etapas[nome] += duracao
+            self.ocorrencias[nome].append(duracao)
+
+    def duracao_total(self):
+        return time.perf_counter() - self._inicio_relogio
+
+
+class MedidorEtapas:
+    """Grava os tempos por etapa de cada processo em JSONL e resume a execução ao final.
+
+    Cada linha do arquivo é um registro {"tipo": "processo", ...} com a duração total e a soma
+    por etapa, ou {"tipo": "login", ...} com a duração de uma autenticação no SEI.
+    """
+
+    def __init__(self, registros_path):
+        self.registros_path = registros_path
+        self._lock = threading.Lock()
+        self._ocorrencias = defaultdict(list)
+        self._processos = []
+        os.makedirs(os.path.dirname(registros_path), exist_ok=True)
+
+    def processo(self, processo):
+        return TemposProcesso(processo)
+
+    def _gravar(self, registro):
+        with open(self.registros_path, "a", encoding="utf-8") as arquivo:
+            arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+    def concluir(self, tempos, status):
+        total = tempos.duracao_total()
+        registro = {
+            "tipo": "processo",
+            "processo": tempos.processo,
+            "status": status,
+            "inicio": tempos.inicio,
+            "duracao_total": round(total, 4),
+            "etapas": {nome: round(duracao, 4) for nome, duracao in tempos.etapas.items()},
+            "ocorrencias": {nome: len(duracoes) for nome, duracoes in tempos.ocorrencias.items()},
+            "thread": threading.current_thread().name,
+        }
+        with self._lock:
+            for nome, duracoes in tempos.ocorrencias.items():
+                self._ocorrencias[nome].extend(duracoes)
+            self._processos.append((total, tempos.processo))
+            self._gravar(registro)
+
+    def registrar(self, etapa, duracao, **extras):
+        with self._lock:
+            self._ocorrencias[etapa].append(duracao)
+            self._gravar(dict({"tipo": etapa, "inicio": time.time() - duracao, "duracao_total": round(duracao, 4)}, **extras))
+
+    def resumo(self, mais_lentos=5):
+        """Linhas de texto com p50/p95/máx por etapa e os processos mais lentos."""
+        with self._lock:
+            ocorrencias = {nome: sorted(duracoes) for nome, duracoes in self._ocorrencias.items()}
+            processos = sorted(self._processos, reverse=True)[:mais_lentos]
+        linhas = [f"{'etapa':<20} {'n':>6} {'p50 (s)':>9} {'p95 (s)':>9} {'máx (s)':>9} {'total (s)':>10}"]
+        for nome, duracoes in sorted(ocorrencias.items(), key=lambda item: -sum(item[1])):
+            linhas.append(
+                f"{nome:<20} {len(duracoes):>6} {percentil(duracoes, 50):>9.2f} {percentil(duracoes, 95):>9.2f} "
+                f"{duracoes[-1]:>9.2f} {sum(duracoes):>10.1f}"
+            )
+        if processos:
+            linhas.append("Processos mais lentos: " + ", ".join(f"{processo} ({total:.1f}s)" for total, processo in processos))
+        return linhas
+
+    def registrar_resumo(self):
+        for linha in self.resumo():
+            logging.info(linha)
+        logging.info(f"Tempos por processo gravados em: {self.registros_path}")
@@ -0,0 +1,249 @@
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from statistics import median
+
+import pytesseract
+from PIL import Image, ImageOps
+
+from logs_estruturados import contexto_log
+from parser_termo import RE_NOME_NA_CELULA, RE_ROTULO_NOME, normalizar_rotulo, montar_itens
+
+FORMATOS_ARQUIVO = ("webp", "png", "jpeg")
+
+# No Windows o executável do Tesseract normalmente não está no PATH
+if os.environ.get("TESSERACT_CMD"):
+    pytesseract.pytesseract.tesseract_cmd = os.environ["TESSERACT_CMD"]
+
+IDIOMA_TESSERACT = "por"
+# psm 6: um único bloco de texto uniforme, que mantém cada linha da tabela como uma linha do OCR
+CONFIG_TESSERACT = "--psm 6"
+
+# Capturas mais estreitas que isso (em pixels) são ampliadas antes do OCR
+LARGURA_MINIMA = 1600
+LIMIAR_BINARIZACAO = 170
+# Distância entre palavras, em alturas de letra, a partir da qual começa uma nova célula
+SEPARACAO_CELULA = 1.5
+
+
+def preprocessar(imagem):
+    """Tons de cinza, ampliação e binarização da captura, que melhoram o reconhecimento do Tesseract."""
+    imagem = ImageOps.autocontrast(imagem.convert("L"))
+    if imagem.width < LARGURA_MINIMA:
+        fator = LARGURA_MINIMA / imagem.width
+        imagem = imagem.resize((LARGURA_MINIMA, round(imagem.height * fator)), Image.LANCZOS)
+    return imagem.point(lambda pixel: 255 if pixel > LIMIAR_BINARIZACAO else 0)
+
+
+def ocr_linhas(imagem):
+    """Reconhece a imagem e retorna o texto de cada linha dividido em células pelo espaçamento horizontal."""
+    dados = pytesseract.image_to_data(preprocessar(imagem), lang=IDIOMA_TESSERACT, config=CONFIG_TESSERACT,
+                                      output_type=pytesseract.Output.DICT)
+    palavras = {}
+    for i, texto in enumerate(dados["text"]):
+        if texto.strip():
+            chave = (dados["block_num"][i], dados["par_num"][i], dados["line_num"][i])
+            palavras.setdefault(chave, []).append((dados["left"][i], dados["width"][i], dados["height"][i], texto.strip()))
+
+    linhas = []
+    for chave in sorted(palavras):
+        itens = sorted(palavras[chave])
+        altura = median(altura for _, _, altura, _ in itens)
+        celulas = [[itens[0][3]]]
+        for (esquerda_ant, largura_ant, _, _), (esquerda, _, _, texto) in zip(itens, itens[1:]):
+            if esquerda - (esquerda_ant + largura_ant) > altura * SEPARACAO_CELULA:
+                celulas.append([])
+            celulas[-1].append(texto)
+        linhas.append([" ".join(celula) for celula in celulas])
+    return linhas
+
+
+def ocr_nome(imagem):
+    """Procura o nome do servidor nas linhas reconhecidas da tabela do servidor."""
+    for celulas in ocr_linhas(imagem):
+        for i, celula in enumerate(celulas):
+            normalizado = normalizar_rotulo(celula)
+            if RE_ROTULO_NOME.match(normalizado) and i + 1 < len(celulas):
+                return celulas[i + 1]
+            if RE_NOME_NA_CELULA.match(normalizado):
+                return celula.split(":", 1)[1].strip()
+    return ""
+
+
+def eh_cabecalho(celulas):
+    normalizado = normalizar_rotulo(" ".join(celulas))
+    return "MATERIAL" in normalizado or "MODELO" in normalizado
+
+
+def nome_captura(process_number, documento_titulo, tabela, png):
+    """Nome de arquivo seguro para a captura: processo e título só com [A-Za-z0-9_-] mais o hash do conteúdo.
+
+    Títulos do SEI podem ter "/", ":" e acentos; o hash evita colisões entre títulos que ficam
+    iguais depois de sanitizados.
+    """
+    def sanitizar(texto):
+        return re.sub(r"[^A-Za-z0-9-]+", "_", normalizar_rotulo(texto)).strip("_")[:60]
+    return f"{sanitizar(process_number)}_{sanitizar(documento_titulo)}_{tabela}_{hashlib.sha256(png).hexdigest()[:16]}"
+
+
+def compactar_captura(imagem, formato, escala):
+    """Reduz a captura (tons de cinza e, se escala < 1, resolução menor) e a codifica em formato."""
+    imagem = imagem.convert("L")
+    if escala < 1:
+        imagem = imagem.resize((max(1, round(imagem.width * escala)), max(1, round(imagem.height * escala))), Image.LANCZOS)
+    saida = io.BytesIO()
+    if formato == "png":
+        imagem.save(saida, format="PNG", optimize=True)
+    else:
+        imagem.save(saida, format=formato.upper(), quality=60)
+    return saida.getvalue()
+
+
+def processar_captura(process_number, documento_titulo, png_servidor, png_itens, arquivamento=None, nome_funcionario=""):
+    """Executa o OCR das duas tabelas de um Termo e retorna os itens no mesmo formato do extrator de texto.
+
+    Roda nos processos do pool e recebe as capturas como bytes PNG, sem passar pelo disco. Com
+    arquivamento=(formato, escala), também devolve as capturas compactadas para o arquivo.
+    nome_funcionario, se já lido do HTML do Termo, é usado no lugar do OCR da tabela do servidor.
+    Retorna (itens, [(nome do arquivo, bytes)]).
+    """
+    capturas = []
+    linhas = []
+    for tabela, png in (("servidor", png_servidor), ("itens", png_itens)):
+        if not png:
+            continue
+        with Image.open(io.BytesIO(png)) as imagem:
+            if tabela == "servidor":
+                if not nome_funcionario:
+                    nome_funcionario = ocr_nome(imagem)
+            else:
+                linhas = ocr_linhas(imagem)
+            if arquivamento is not None:
+                formato, escala = arquivamento
+                nome = f"{nome_captura(process_number, documento_titulo, tabela, png)}.{formato}"
+                capturas.append((nome, compactar_captura(imagem, formato, escala)))
+    if linhas and eh_cabecalho(linhas[0]):
+        linhas = linhas[1:]
+    return montar_itens(process_number, documento_titulo, nome_funcionario, linhas), capturas
+
+
+class ArquivoCapturas:
+    """Diretório opcional com as capturas compactadas, limitado a limite_bytes.
+
+    Ao passar do limite, as capturas mais antigas são apagadas.
+    """
+
+    def __init__(self, diretorio, formato="webp", escala=0.5, limite_bytes=200 * 1024 * 1024):
+        if formato not in FORMATOS_ARQUIVO:
+            raise ValueError(f"Formato de captura inválido: {formato} (use {', '.join(FORMATOS_ARQUIVO)})")
+        self.diretorio = diretorio
+        self.formato = formato
+        self.escala = escala
+        self.limite_bytes = limite_bytes
+        self._lock = threading.Lock()
+        os.makedirs(diretorio, exist_ok=True)
+        self._tamanho = sum(entrada.stat().st_size for entrada in os.scandir(diretorio) if entrada.is_file())
+
+    def salvar(self, nome, dados):
+        caminho = os.path.join(self.diretorio, nome)
+        with self._lock:
+            if os.path.exists(caminho):
+                return
+            with open(caminho, "wb") as arquivo:
+                arquivo.write(dados)
+            self._tamanho += len(dados)
+            if self._tamanho > self.limite_bytes:
+                self._aplicar_limite()
+
+    def _aplicar_limite(self):
+        # Apaga as mais antigas até ficar em 90% do limite, para não varrer o diretório a cada captura
+        entradas = sorted((entrada for entrada in os.scandir(self.diretorio) if entrada.is_file()),
+                          key=lambda entrada: entrada.stat().st_mtime)
+        removidas = 0
+        for entrada in entradas:
+            if self._tamanho <= self.limite_bytes * 0.9:
+                break
+            tamanho = entrada.stat().st_size
+            try:
+                os.remove(entrada.path)
+            except OSError as e:
+                logging.error(f"Erro ao remover a captura {entrada.path}: {e}")
+                continue
+            self._tamanho -= tamanho
+            removidas += 1
+        logging.info(f"{removidas} capturas antigas removidas de {self.diretorio} (limite de {self.limite_bytes // (1024 * 1024)} MB)")
+
+
+class PipelineOCR:
+    """Fila de OCR em um pool de processos, alimentada pela thread do navegador.
+
+    enviar() apenas agenda as capturas (bytes PNG) e retorna na hora; o OCR roda em num_processos
+    processos (padrão: um por núcleo) e os itens de cada Termo vão para o journal assim que ficam
+    prontos. Com um ArquivoCapturas, as capturas também são compactadas no pool e gravadas nele.
+    encerrar() espera as capturas pendentes.
+    """
+
+    def __init__(self, journal, num_processos=None, arquivo=None):
+        self.journal = journal
+        self.arquivo = arquivo
+        self.num_processos = num_processos or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(max_workers=self.num_processos)
+        self._lock = threading.Lock()
+        self._inicio = time.perf_counter()
+        self.enviados = 0
+        self.concluidos = 0
+        self.falhas = 0
+        self.itens = 0
+
+    def enviar(self, process_number, documento_titulo, png_servidor, png_itens, ao_concluir=None, nome_funcionario=""):
+        """Agenda o OCR do documento; ao_concluir(itens, erro), se informado, é chamado ao final.
+
+        nome_funcionario: nome já lido do HTML, que prevalece sobre o lido da captura.
+        """
+        with self._lock:
+            self.enviados += 1
+        arquivamento = (self.arquivo.formato, self.arquivo.escala) if self.arquivo is not None else None
+        futuro = self._executor.submit(processar_captura, process_number, documento_titulo, png_servidor, png_itens,
+                                       arquivamento, nome_funcionario)
+        futuro.add_done_callback(lambda f: self._concluir(f, process_number, documento_titulo, ao_concluir))
+
+    def _concluir(self, futuro, process_number, documento_titulo, ao_concluir):
+        # Chamado na thread do pool: o contexto do log não vem da thread do navegador
+        with contexto_log(processo=process_number, documento=documento_titulo, etapa="ocr"):
+            try:
+                itens, capturas = futuro.result()
+                self.journal.adicionar(itens)
+            except Exception as e:
+                logging.error(f"Erro no OCR do documento {documento_titulo} do processo {process_number}: {e}")
+                with self._lock:
+                    self.falhas += 1
+                if ao_concluir is not None:
+                    ao_concluir([], f"[ocr] {e}")
+                return
+            logging.info(f"OCR concluído: {len(itens)} itens do documento {documento_titulo} do processo {process_number}")
+            with self._lock:
+                self.concluidos += 1
+                self.itens += len(itens)
+            if ao_concluir is not None:
+                ao_concluir(itens, None)
+            for nome, dados in capturas:
+                try:
+                    self.arquivo.salvar(nome, dados)
+                except OSError as e:
+                    logging.error(f"Erro ao guardar a captura {nome}: {e}")
+
+    def pendentes(self):
+        with self._lock:
+            return self.enviados - self.concluidos - self.falhas
+
+    def encerrar(self):
+        logging.info(f"Aguardando {self.pendentes()} capturas na fila de OCR")
+        self._executor.shutdown(wait=True)
+        duracao = time.perf_counter() - self._inicio
+        logging.info(f"OCR: {self.concluidos} documentos ({self.itens} itens), {self.falhas} falhas em {duracao:.1f}s "
+                     f"com {self.num_processos} processos ({self.concluidos / duracao * 60 if duracao else 0:.1f} documentos/min)")
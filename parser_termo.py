@@ -0,0 +1,89 @@
+import re
+import unicodedata
+
+from lxml import html as lxml_html
+
+# Rótulos aceitos para o campo do nome do servidor, já normalizados (maiúsculas, sem acentos).
+# Os Termos mais antigos usam "NOME DO SERVIDOR" / "NOME COMPLETO" em vez de "NOME".
+RE_ROTULO_NOME = re.compile(r"^NOME(?: DO SERVIDOR| DO EMPREGADO| COMPLETO)?\s*:?$")
+RE_NOME_NA_CELULA = re.compile(r"^NOME(?: DO SERVIDOR| DO EMPREGADO| COMPLETO)?\s*:\s*(.+)$")
+
+
+def _texto(elemento):
+    return " ".join(elemento.text_content().split())
+
+
+def normalizar_rotulo(texto):
+    sem_acentos = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+    return " ".join(sem_acentos.upper().split())
+
+
+def extrair_nome(arvore):
+    """Localiza o nome do servidor no Termo.
+
+    Aceita as variações de layout encontradas nos documentos do SEI:
+    - rótulo e valor em células vizinhas, com ou sem <p class="Texto_Justificado">;
+    - rótulo em negrito, com &nbsp; ou em caixa baixa ("Nome:");
+    - rótulo e valor na mesma célula ("NOME: Fulano de Tal").
+    Retorna "" se nenhum campo de nome for encontrado.
+    """
+    for td in arvore.iter("td"):
+        # Só células folha: uma célula de layout que contém a tabela inteira também "começa" com NOME
+        if td.xpath(".//td"):
+            continue
+        texto = _texto(td)
+        if not texto:
+            continue
+        normalizado = normalizar_rotulo(texto)
+        if RE_ROTULO_NOME.match(normalizado):
+            valor = td.getnext()
+            while valor is not None and valor.tag != "td":
+                valor = valor.getnext()
+            if valor is not None and _texto(valor):
+                return _texto(valor)
+        else:
+            correspondencia = RE_NOME_NA_CELULA.match(normalizado)
+            if correspondencia:
+                # Recorta do texto original, preservando acentos e caixa do nome
+                return texto.split(":", 1)[1].strip()
+    return ""
+
+
+def extrair_linhas(arvore):
+    """Texto das células de cada linha das tabelas do Termo, exceto a primeira linha de cada tabela."""
+    return [[_texto(td) for td in tr.xpath("./td")] for tr in arvore.xpath("//table//tr[position()>1]")]
+
+
+def extrair_conteudo(html):
+    """Lê o nome do servidor e as linhas da tabela de um Termo a partir do HTML do documento."""
+    arvore = lxml_html.fromstring(html)
+    return {"nome": extrair_nome(arvore), "linhas": extrair_linhas(arvore)}
+
+
+def montar_itens(process_number, documento_titulo, nome_funcionario, linhas):
+    """Converte as linhas da tabela do Termo (listas de textos das células) nos registros de itens.
+
+    Linhas com menos de três células ou com MODELO vazio são ignoradas; a QUANTIDADE é opcional.
+    """
+    itens = []
+    for celulas in linhas:
+        if len(celulas) >= 3 and celulas[1].strip():
+            material = celulas[0].strip()
+            modelo = celulas[1].strip()
+            tamanho = celulas[2].strip()
+            quantidade = ""
+
+            if len(celulas) > 3:
+                quantidade = celulas[3].strip()
+
+            if modelo or tamanho or quantidade:
+                itens.append({
+                    "PROCESSO": process_number,
+                    "NOME ARQUIVO": documento_titulo,
+                    "NOME": nome_funcionario,
+                    "MATERIAL": material,
+                    "MODELO": modelo,
+                    "TAMANHO/GENERO": tamanho,
+                    "QUANTIDADE": quantidade
+                })
+    return itens
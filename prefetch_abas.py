@@ -0,0 +1,165 @@
+import logging
+import threading
+import time
+from collections import deque
+
+# Limite de abas de pré-carregamento por navegador: cada aba é um renderer a mais do Chrome
+ABAS_MAX = 6
+
+# Intervalo entre as consultas ao estado da aba aguardada
+INTERVALO_CONSULTA_S = 0.05
+
+# Abre (ou reaproveita) a aba nomeada e navega para a URL; executado a partir da aba principal, não
+# espera o carregamento nem troca a janela atual do WebDriver
+JS_CARREGAR_ABA = "window.open(arguments[0], arguments[1]);"
+
+# HTML do conteúdo do documento (ifrArvoreHtml) da aba nomeada, lido pela aba principal (mesma
+# origem). Retorna null enquanto a aba não terminou de carregar a URL esperada.
+JS_LER_ABA = """
+const aba = window.open('', arguments[0]);
+const esperado = new URL(arguments[1], location.href).href;
+let doc;
+try {
+    doc = aba.document;
+    if (aba.location.href !== esperado || doc.readyState !== 'complete') {
+        return null;
+    }
+} catch (e) {
+    return {erro: String(e)};
+}
+const frame = doc.getElementById('ifrArvoreHtml');
+const conteudo = frame ? frame.contentDocument : doc;
+if (!conteudo || conteudo.readyState !== 'complete' || conteudo.URL === 'about:blank') {
+    return null;
+}
+return {html: conteudo.documentElement.outerHTML};
+"""
+
+
+class TotaisPrefetch:
+    """Acertos e falhas do pré-carregamento de todas as sessões, para ajustar o número de abas."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def registrar(self, acertos, falhas):
+        with self._lock:
+            self.acertos += acertos
+            self.falhas += falhas
+
+    def resumo(self):
+        with self._lock:
+            total = self.acertos + self.falhas
+            taxa = f" ({self.acertos / total:.0%} de acerto)" if total else ""
+            return f"{self.acertos} documentos pré-carregados, {self.falhas} falhas{taxa}"
+
+
+totais = TotaisPrefetch()
+
+
+class PrefetchAbas:
+    """Pré-carrega os próximos documentos do processo em abas do mesmo navegador.
+
+    As abas são abertas com window.open a partir da aba principal, então o WebDriver continua
+    nela e o SEI carrega os documentos seguintes enquanto o atual é extraído. O HTML é lido
+    pela aba principal, sem trocar de janela. A aba do último documento entregue só volta a
+    ser usada no obter() seguinte, para que o OCR ainda possa capturá-la.
+    """
+
+    def __init__(self, driver, abas, timeout_s=30):
+        self.driver = driver
+        self.abas = max(1, min(abas, ABAS_MAX))
+        self.timeout_s = timeout_s
+        self.controle = driver.current_window_handle
+        self._handles = {}
+        antes = set(driver.window_handles)
+        for i in range(self.abas):
+            nome = f"prefetch_{i}"
+            driver.execute_script(JS_CARREGAR_ABA, "about:blank", nome)
+            novos = set(driver.window_handles) - antes
+            if novos:
+                self._handles[nome] = novos.pop()
+                antes.add(self._handles[nome])
+        self._livres = list(self._handles)
+        self._em_voo = {}
+        self._fila = deque()
+        self._entregue = None
+        self.acertos = 0
+        self.falhas = 0
+
+    def iniciar(self, documentos):
+        """Descarta o pré-carregamento anterior e começa a carregar os primeiros documentos da lista."""
+        self._fila = deque(documento["href"] for documento in documentos)
+        self._livres = list(self._handles)
+        self._em_voo = {}
+        self._entregue = None
+        self._preencher()
+
+    def _preencher(self):
+        while self._livres and self._fila:
+            href = self._fila.popleft()
+            nome = self._livres.pop()
+            self.driver.execute_script(JS_CARREGAR_ABA, href, nome)
+            self._em_voo[href] = nome
+
+    def obter(self, documento):
+        """Retorna o HTML do conteúdo do documento, ou None se ele não estiver pré-carregado ou não
+        carregar em timeout_s (o chamador então o abre pela aba principal)."""
+        if self._entregue is not None:
+            self._livres.append(self._entregue)
+            self._entregue = None
+        self._preencher()
+        nome = self._em_voo.pop(documento["href"], None)
+        if nome is None:
+            return None
+        if self._handles[nome] not in self.driver.window_handles:
+            # Com a aba fechada, o window.open de JS_LER_ABA abriria uma janela em branco e a leitura
+            # só desistiria em timeout_s; a aba sai do rodízio
+            logging.warning(f"Aba de pré-carregamento {nome} não existe mais; o documento {documento['titulo']} "
+                            f"será aberto pela aba principal")
+            del self._handles[nome]
+            self.falhas += 1
+            return None
+        limite = time.monotonic() + self.timeout_s
+        while True:
+            estado = self.driver.execute_script(JS_LER_ABA, nome, documento["href"])
+            if estado and "html" in estado:
+                self._entregue = nome
+                self.acertos += 1
+                self._preencher()
+                return estado["html"]
+            if (estado and "erro" in estado) or time.monotonic() > limite:
+                logging.warning(f"Pré-carregamento do documento {documento['titulo']} falhou: "
+                                f"{estado['erro'] if estado else 'tempo esgotado'}")
+                self._livres.append(nome)
+                self.falhas += 1
+                return None
+            time.sleep(INTERVALO_CONSULTA_S)
+
+    def aba_entregue(self):
+        """Handle da aba com o último documento entregue, para quem precisar da página renderizada."""
+        return self._handles.get(self._entregue)
+
+    def fechar(self, abas=True):
+        """Soma os acertos e falhas em `totais` e fecha as abas de pré-carregamento.
+
+        abas=False só registra os contadores, para um navegador que já foi encerrado (ex.: reiniciado
+        pelo supervisor). Fecha todas as janelas além da principal, inclusive as que um window.open
+        tenha aberto no lugar de uma aba fechada.
+        """
+        totais.registrar(self.acertos, self.falhas)
+        logging.info(f"Pré-carregamento com {self.abas} abas: {self.acertos} acertos, {self.falhas} falhas")
+        self.acertos = self.falhas = 0
+        if not abas:
+            return
+        try:
+            for handle in self.driver.window_handles:
+                if handle != self.controle:
+                    self.driver.switch_to.window(handle)
+                    self.driver.close()
+            self.driver.switch_to.window(self.controle)
+        except Exception as e:
+            logging.error(f"Erro ao fechar as abas de pré-carregamento: {e}")
+        self._handles = {}
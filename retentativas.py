@@ -0,0 +1,130 @@
+import logging
+import random
+import threading
+import time
+
+import urllib3
+from selenium.common.exceptions import (
+    InvalidArgumentException,
+    InvalidSelectorException,
+    JavascriptException,
+    NoSuchElementException,
+    NoSuchFrameException,
+    StaleElementReferenceException,
+    TimeoutException,
+    UnexpectedAlertPresentException,
+    WebDriverException,
+)
+
+TRANSITORIO = "transitorio"
+PERMANENTE = "permanente"
+
+# Falhas que costumam passar numa nova tentativa: SEI lento, página recarregada no meio da
+# leitura, conexão com o chromedriver/servidor interrompida (inclusive no modo --http)
+ERROS_TRANSITORIOS = (TimeoutException, StaleElementReferenceException, TimeoutError, ConnectionError,
+                      urllib3.exceptions.HTTPError)
+
+# Falhas que se repetem igual em toda tentativa: elemento que não existe no documento, alerta do
+# SEI (ex.: "Protocolo não encontrado"), script ou seletor inválido
+ERROS_PERMANENTES = (
+    NoSuchElementException,
+    NoSuchFrameException,
+    UnexpectedAlertPresentException,
+    InvalidArgumentException,
+    InvalidSelectorException,
+    JavascriptException,
+)
+
+
+def classificar_erro(erro):
+    """Classifica o erro como TRANSITORIO (vale repetir) ou PERMANENTE (desistir já)."""
+    if isinstance(erro, ERROS_PERMANENTES):
+        return PERMANENTE
+    if isinstance(erro, ERROS_TRANSITORIOS):
+        return TRANSITORIO
+    if isinstance(erro, WebDriverException):
+        # Demais erros do WebDriver (net::ERR_*, conexão recusada, renderer travado) são de infraestrutura
+        return TRANSITORIO
+    return PERMANENTE
+
+
+class OrcamentoProcesso:
+    """Quantas novas tentativas ainda podem ser gastas com um processo."""
+
+    def __init__(self, limite):
+        self.restantes = limite
+        self.usadas = 0
+
+
+class PoliticaRetentativa:
+    """Repete passos com erro transitório, com backoff exponencial e jitter.
+
+    Cada passo é tentado até tentativas_max vezes. Toda nova tentativa consome uma unidade do
+    orçamento do processo e do orçamento global da execução; esgotado qualquer um deles, o erro
+    é propagado na hora. Erros permanentes nunca são repetidos.
+    """
+
+    def __init__(self, tentativas_max=3, espera_base_s=2.0, espera_max_s=30.0,
+                 orcamento_processo=5, orcamento_execucao=200):
+        self.tentativas_max = tentativas_max
+        self.espera_base_s = espera_base_s
+        self.espera_max_s = espera_max_s
+        self.limite_processo = orcamento_processo
+        self.restantes_execucao = orcamento_execucao
+        self.retentativas = 0
+        self.desistencias = {TRANSITORIO: 0, PERMANENTE: 0}
+        self._lock = threading.Lock()
+
+    def orcamento_processo(self):
+        return OrcamentoProcesso(self.limite_processo)
+
+    def _espera(self, tentativa):
+        # "Full jitter": sorteia entre 0 e o teto exponencial, para os workers não repetirem juntos
+        teto = min(self.espera_max_s, self.espera_base_s * (2 ** (tentativa - 1)))
+        return random.uniform(0, teto)
+
+    def _consumir(self, orcamento):
+        with self._lock:
+            if orcamento.restantes <= 0 or self.restantes_execucao <= 0:
+                return False
+            orcamento.restantes -= 1
+            orcamento.usadas += 1
+            self.restantes_execucao -= 1
+            self.retentativas += 1
+            return True
+
+    def executar(self, passo, descricao, orcamento, antes_de_repetir=None, desistir=None):
+        """Executa passo(), repetindo-o em erros transitórios enquanto houver tentativas e orçamento.
+
+        antes_de_repetir, se informado, é chamado antes de cada nova tentativa (ex.: voltar à
+        tela inicial do SEI). desistir, se informado, é consultado depois de cada erro; se
+        retornar True o erro é propagado sem repetir (ex.: navegador encerrado pelo supervisor).
+        """
+        tentativa = 1
+        while True:
+            try:
+                return passo()
+            except Exception as e:
+                tipo = classificar_erro(e)
+                if (tipo == PERMANENTE or tentativa >= self.tentativas_max
+                        or (desistir is not None and desistir()) or not self._consumir(orcamento)):
+                    with self._lock:
+                        self.desistencias[tipo] += 1
+                    e.classificacao = tipo
+                    raise
+                espera = self._espera(tentativa)
+                logging.warning(f"{descricao}: erro transitório ({type(e).__name__}); "
+                                f"tentativa {tentativa + 1}/{self.tentativas_max} em {espera:.1f}s")
+                time.sleep(espera)
+                if antes_de_repetir is not None:
+                    try:
+                        antes_de_repetir()
+                    except Exception as e_preparo:
+                        logging.error(f"{descricao}: erro ao preparar nova tentativa: {e_preparo}")
+                tentativa += 1
+
+    def resumo(self):
+        with self._lock:
+            return (f"{self.retentativas} novas tentativas; desistências: {self.desistencias[TRANSITORIO]} transitórias "
+                    f"(tentativas/orçamento esgotados), {self.desistencias[PERMANENTE]} permanentes; "
+                    f"orçamento restante da execução: {self.restantes_execucao}")
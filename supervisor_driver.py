@@ -0,0 +1,105 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from metricas import percentil
+
+
+class SupervisorDriver:
+    """Vigia os prazos das chamadas ao navegador e encerra o Chrome de uma sessão travada.
+
+    Cada trecho supervisionado roda dentro de prazo(sei, descricao, segundos). Uma thread
+    verifica os prazos a cada intervalo_s; se um trecho passar do prazo, o chromedriver e o
+    Chrome da sessão são encerrados à força (SeiLogin.matar_navegador), o que faz a chamada
+    travada falhar e devolve o controle à thread de extração. Quem chamou consulta
+    consumir_travamento(sei) e reinicia a sessão com reiniciar().
+    """
+
+    def __init__(self, intervalo_s=1.0):
+        self.intervalo_s = intervalo_s
+        self._lock = threading.Lock()
+        # id(sessão) -> lista de prazos ativos [sei, descricao, inicio, limite]
+        self._prazos = {}
+        # id(sessão) -> (descricao, segundos parados) do último travamento ainda não tratado
+        self._travamentos = {}
+        self.reinicios = 0
+        self.falhas_reinicio = 0
+        self.duracoes_travamento = []
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._vigiar, name="supervisor-driver", daemon=True)
+        self._thread.start()
+
+    @contextmanager
+    def prazo(self, sei, descricao, segundos):
+        """Supervisiona o trecho; segundos <= 0 desativa o prazo."""
+        if not segundos or segundos <= 0:
+            yield
+            return
+        inicio = time.monotonic()
+        registro = [sei, descricao, inicio, inicio + segundos]
+        with self._lock:
+            self._prazos.setdefault(id(sei), []).append(registro)
+        try:
+            yield
+        finally:
+            with self._lock:
+                prazos = self._prazos.get(id(sei), [])
+                if registro in prazos:
+                    prazos.remove(registro)
+                if not prazos:
+                    self._prazos.pop(id(sei), None)
+
+    def _vigiar(self):
+        while not self._parar.wait(self.intervalo_s):
+            agora = time.monotonic()
+            vencidos = []
+            with self._lock:
+                for chave, prazos in list(self._prazos.items()):
+                    vencido = next((registro for registro in prazos if registro[3] <= agora), None)
+                    if vencido is not None:
+                        sei, descricao, inicio, _ = vencido
+                        self._travamentos[chave] = (descricao, agora - inicio)
+                        self.duracoes_travamento.append(agora - inicio)
+                        # Os prazos da sessão deixam de valer: o navegador será substituído
+                        del self._prazos[chave]
+                        vencidos.append((sei, descricao, agora - inicio))
+            for sei, descricao, parado in vencidos:
+                logging.error(f"Navegador travado há {parado:.0f}s em: {descricao}; encerrando o Chrome da sessão")
+                sei.matar_navegador()
+
+    def consumir_travamento(self, sei):
+        """Retorna (descricao, segundos parados) se a sessão foi encerrada por travamento, ou None."""
+        with self._lock:
+            return self._travamentos.pop(id(sei), None)
+
+    def travado(self, sei):
+        with self._lock:
+            return id(sei) in self._travamentos
+
+    def reiniciar(self, sei):
+        """Abre um novo navegador para a sessão, reaproveitando a autenticação; retorna True se deu certo."""
+        inicio = time.perf_counter()
+        sucesso = sei.reiniciar_navegador()
+        duracao = time.perf_counter() - inicio
+        with self._lock:
+            if sucesso:
+                self.reinicios += 1
+            else:
+                self.falhas_reinicio += 1
+        if sucesso:
+            logging.warning(f"Navegador reiniciado em {duracao:.1f}s")
+        else:
+            logging.error(f"Falha ao reiniciar o navegador ({duracao:.1f}s)")
+        return sucesso
+
+    def resumo(self):
+        with self._lock:
+            duracoes = sorted(self.duracoes_travamento)
+            texto = f"{len(duracoes)} travamentos, {self.reinicios} reinícios do navegador, {self.falhas_reinicio} falhas ao reiniciar"
+        if duracoes:
+            texto += f"; tempo parado p50 {percentil(duracoes, 50):.0f}s, máx {duracoes[-1]:.0f}s"
+        return texto
+
+    def encerrar(self):
+        self._parar.set()